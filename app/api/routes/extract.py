@@ -111,14 +111,14 @@ async def extract_file(
             record_extraction_start(
                 file_path=temp_file_path,
                 file_size=file_info['size'],
-                file_type=temp_file_path.suffix.lower(),
+                file_type=file_info['extension'],
             )
 
             # Passenden Extraktor finden
             extractor = get_extractor(temp_file_path)
 
             # Extraktion durchführen
-            result = extractor.extract(
+            result = await extractor.extract_async(
                 file_path=temp_file_path,
                 include_metadata=include_metadata,
                 include_text=include_text,
@@ -151,7 +151,7 @@ async def extract_file(
                         except Exception:
                             pass
                         tika = TikaExtractor()
-                        fallback_result = tika.extract(
+                        fallback_result = await tika.extract_async(
                             file_path=temp_file_path,
                             include_metadata=include_metadata,
                             include_text=True,
@@ -137,6 +137,14 @@ class Settings(BaseSettings):
         default=True,
         description='OCR für Bilder aktivieren',
     )
+    ocr_denoise: bool = Field(
+        default=False,
+        description='Rauschunterdrückung (Median-Filter) vor der OCR',
+    )
+    ocr_max_side: int = Field(
+        default=2240,  # Canvas-Größe der EasyOCR-Texterkennung (CRAFT)
+        description='Maximale Kantenlänge (Pixel) von Bildern für die OCR',
+    )
 
     # Medien-Extraktion
     enable_media_extraction: bool = Field(
@@ -151,6 +159,14 @@ class Settings(BaseSettings):
         default=False,
         description='Audio-Transkription aktivieren',
     )
+    whisper_model: str = Field(
+        default='small',
+        description='Whisper-Modell für die lokale Transkription (faster-whisper)',
+    )
+    whisper_compute_type: str = Field(
+        default='int8',
+        description='Rechengenauigkeit für Whisper (int8, float16, float32)',
+    )
 
     # Docling-Konfiguration
     enable_docling: bool = Field(
@@ -173,6 +189,10 @@ class Settings(BaseSettings):
         default=3600,  # 1 Stunde
         description='Docling-Cache TTL in Sekunden',
     )
+    docling_device: str = Field(
+        default='auto',
+        description='Gerät für die Docling-Modelle (auto, cpu, cuda, mps)',
+    )
 
     # Tika-Konfiguration
     enable_tika: bool = Field(
@@ -248,6 +268,10 @@ class Settings(BaseSettings):
         default=0,
         description='Redis-Datenbank',
     )
+    redis_pool_size: int = Field(
+        default=20,
+        description='Maximale Anzahl Redis-Verbindungen pro Prozess',
+    )
 
     # Cloud-Deployment
     environment: str = Field(
@@ -259,10 +283,10 @@ class Settings(BaseSettings):
         description='Metriken über OpenTelemetry aktivieren',
     )
 
-    # Test/Dev: Verarbeitungslast simulieren (für Performance-Relationen)
+    # Test/Dev: Verarbeitungsdauer simulieren (für Performance-Relationen)
     simulate_processing: bool = Field(
         default=True,
-        description='Simuliert CPU-Last proportional zur Dateigröße (nicht in Produktion)',
+        description='Simuliert Verarbeitungsdauer proportional zur Dateigröße (nicht in Produktion)',
     )
 
     # OpenTelemetry-Konfiguration
@@ -347,15 +371,15 @@ class Settings(BaseSettings):
         description='Celery result backend',
     )
     celery_task_serializer: str = Field(
-        default='json',
+        default='msgpack',
         description='Celery task serializer',
     )
     celery_result_serializer: str = Field(
-        default='json',
+        default='msgpack',
         description='Celery result serializer',
     )
     celery_accept_content: str = Field(
-        default='json',
+        default='msgpack',
         description='Celery accept content',
     )
     celery_timezone: str = Field(default='UTC', description='Celery timezone')
@@ -21,6 +21,26 @@ class FileExtractorError(Exception):
         self.details = details or {}
         super().__init__(self.message)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Unterklassen haben eigene __init__-Signaturen; für Pickle (z. B. aus
+        # Worker-Prozessen) über die Basis-Felder wiederherstellen
+        return (
+            _restore_error,
+            (type(self), self.message, self.error_code, self.details),
+        )
+
+
+def _restore_error(
+    cls: type[FileExtractorError],
+    message: str,
+    error_code: str,
+    details: dict[str, Any],
+) -> FileExtractorError:
+    """Stellt eine gepickelte FileExtractorError-Instanz wieder her."""
+    exc = cls.__new__(cls)
+    FileExtractorError.__init__(exc, message, error_code, details)
+    return exc
+
 
 class UnsupportedFileFormatException(FileExtractorError):
     """Exception für nicht unterstützte Dateiformate."""
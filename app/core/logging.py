@@ -3,25 +3,31 @@ Strukturiertes Logging und OpenTelemetry-Konfiguration für Microservice.
 """
 
 import logging
+import os
+import socket
 import sys
-from datetime import UTC, datetime
 from typing import Any
 
 import structlog
 from opentelemetry import metrics, trace
-from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
-from opentelemetry.instrumentation.redis import RedisInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
 
 from app.core.config import settings
 
+_ERROR_LEVELS = frozenset({'error', 'critical', 'exception'})
+_stack_info_renderer = structlog.processors.StackInfoRenderer()
+
+
+def add_exc_info_on_error(
+    logger: Any,
+    method_name: str,
+    event_dict: dict[str, Any],
+) -> dict[str, Any]:
+    """Rendert Stack- und Exception-Infos nur für Fehler-Events."""
+    if event_dict.get('level') not in _ERROR_LEVELS:
+        return event_dict
+    event_dict = _stack_info_renderer(logger, method_name, event_dict)
+    return structlog.processors.format_exc_info(logger, method_name, event_dict)
+
 
 def setup_structured_logging() -> None:
     """Konfiguriert strukturiertes Logging mit structlog."""
@@ -34,8 +40,7 @@ def setup_structured_logging() -> None:
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt='iso'),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
+            add_exc_info_on_error,
             structlog.processors.UnicodeDecoder(),
             structlog.processors.JSONRenderer()
             if not settings.debug
@@ -57,13 +62,36 @@ def setup_structured_logging() -> None:
 
 def setup_opentelemetry() -> None:
     """Konfiguriert OpenTelemetry für Tracing und Metriken."""
+    # Exporter, SDK und Instrumentierungen erst hier laden, damit get_logger()
+    # ohne die schweren OpenTelemetry-Module importierbar bleibt
+    from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
+        OTLPMetricExporter,
+    )
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+        OTLPSpanExporter,
+    )
+    from opentelemetry.instrumentation.logging import LoggingInstrumentor
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+    )
+
+    # Stabile Instanz-ID (Pod-Name bzw. Host + PID) statt Startzeitpunkt,
+    # damit nicht jeder Neustart eine neue Zeitreihen-Identität erzeugt
+    instance_id = os.environ.get('HOSTNAME') or f'{socket.gethostname()}-{os.getpid()}'
 
     # Resource für Service-Informationen
     resource = Resource.create(
         {
             'service.name': settings.app_name,
             'service.version': settings.app_version,
-            'service.instance.id': f'{settings.app_name}-{datetime.now(UTC).isoformat()}',
+            'service.instance.id': instance_id,
             'deployment.environment': settings.environment,
             'service.namespace': 'file-extractor',
         },
@@ -92,7 +120,9 @@ def setup_opentelemetry() -> None:
     if settings.enable_metrics:
         metric_readers = []
 
-        # OTLP Metric Reader für zentrale Infrastruktur
+        # OTLP Metric Reader für zentrale Infrastruktur. Bewusst kein lokaler
+        # Prometheus-Reader: jeder Worker pusht per OTLP, der Collector
+        # aggregiert und stellt /metrics bereit (siehe otel-collector-config.yaml)
         if settings.otlp_endpoint:
             otlp_metric_exporter = OTLPMetricExporter(endpoint=settings.otlp_endpoint)
             otlp_reader = PeriodicExportingMetricReader(
@@ -59,26 +59,27 @@ class MetricsCollector:
         word_count: int = 0,
     ) -> None:
         """Zeichnet eine erfolgreiche Extraktion auf."""
+        file_type = file_path.suffix.lower()
         try:
             # Extraktions-Counter erhöhen
             if 'extractions_total' in self.metrics:
                 self.metrics['extractions_total'].add(
                     1,
-                    {'file_type': file_path.suffix.lower(), 'status': 'success'},
+                    {'file_type': file_type, 'status': 'success'},
                 )
 
             # Extraktionsdauer aufzeichnen
             if 'extraction_duration_seconds' in self.metrics:
                 self.metrics['extraction_duration_seconds'].record(
                     duration,
-                    {'file_type': file_path.suffix.lower(), 'status': 'success'},
+                    {'file_type': file_type, 'status': 'success'},
                 )
 
             # Dateityp-spezifische Metriken
             if 'file_type_extractions_total' in self.metrics:
                 self.metrics['file_type_extractions_total'].add(
                     1,
-                    {'file_type': file_path.suffix.lower()},
+                    {'file_type': file_type},
                 )
 
             # Aktive Jobs verringern
@@ -105,19 +106,20 @@ class MetricsCollector:
         error_message: str,
     ) -> None:
         """Zeichnet einen Extraktionsfehler auf."""
+        file_type = file_path.suffix.lower()
         try:
             # Fehler-Counter erhöhen
             if 'extraction_errors_total' in self.metrics:
                 self.metrics['extraction_errors_total'].add(
                     1,
-                    {'file_type': file_path.suffix.lower(), 'error_type': error_type},
+                    {'file_type': file_type, 'error_type': error_type},
                 )
 
             # Extraktionsdauer aufzeichnen (auch bei Fehlern)
             if 'extraction_duration_seconds' in self.metrics:
                 self.metrics['extraction_duration_seconds'].record(
                     duration,
-                    {'file_type': file_path.suffix.lower(), 'status': 'error'},
+                    {'file_type': file_type, 'status': 'error'},
                 )
 
             # Aktive Jobs verringern
@@ -2,7 +2,10 @@
 Queue-Verwaltung für asynchrone Verarbeitung.
 """
 
+import functools
+import json
 import os
+import threading
 import uuid
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
@@ -20,6 +23,18 @@ except ImportError:
 from app.core.config import settings
 from app.models.schemas import AsyncExtractionResponse, JobStatus
 
+# Zählt Job-Status serverseitig in einem Roundtrip statt HGETALL pro Key
+_QUEUE_STATS_LUA = """
+local counts = {queued = 0, processing = 0, completed = 0, failed = 0}
+for _, key in ipairs(redis.call('KEYS', 'job:*')) do
+    local status = redis.call('HGET', key, 'status')
+    if status and counts[status] ~= nil then
+        counts[status] = counts[status] + 1
+    end
+end
+return cjson.encode(counts)
+"""
+
 
 class InMemoryJobQueue:
     """Einfache In-Memory-Queue für Tests/Entwicklung."""
@@ -124,14 +139,25 @@ class JobQueue:
         if not QUEUE_AVAILABLE:
             raise ImportError('Redis und Celery sind nicht installiert.')
 
+        # Gemeinsamer Connection-Pool für alle direkten Redis-Zugriffe
+        self.redis_pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            db=settings.redis_db,
+            max_connections=settings.redis_pool_size,
+        )
+
         # Redis-Verbindung
         try:
-            self.redis_client = redis.from_url(settings.redis_url, db=settings.redis_db)
+            self.redis_client = redis.Redis(connection_pool=self.redis_pool)
             # Check connectivity
             self.redis_client.ping()
         except (redis.exceptions.RedisError, ConnectionError) as e:
             raise ImportError(f'Redis nicht erreichbar: {e}') from e
 
+        self._queue_stats_script = self.redis_client.register_script(
+            _QUEUE_STATS_LUA,
+        )
+
         # Celery-App
         self.celery_app = Celery(
             'file_extractor',
@@ -141,9 +167,9 @@ class JobQueue:
 
         # Celery-Konfiguration
         self.celery_app.conf.update(
-            task_serializer='json',
-            accept_content=['json'],
-            result_serializer='json',
+            task_serializer=settings.celery_task_serializer,
+            accept_content=settings.celery_accept_content.split(','),
+            result_serializer=settings.celery_result_serializer,
             timezone='UTC',
             enable_utc=True,
             task_track_started=True,
@@ -151,6 +177,10 @@ class JobQueue:
             task_soft_time_limit=settings.extract_timeout - 60,
             worker_prefetch_multiplier=1,
             worker_max_tasks_per_child=1000,
+            # Broker- und Backend-Pools auf dieselbe Obergrenze begrenzen
+            broker_pool_limit=settings.redis_pool_size,
+            broker_transport_options={'max_connections': settings.redis_pool_size},
+            redis_max_connections=settings.redis_pool_size,
         )
 
     def submit_job(
@@ -243,8 +273,6 @@ class JobQueue:
 
         # Fallback: Resultat aus Redis lesen, wenn leer
         if result is None:
-            import json
-
             stored_result = job_data.get('result')
             if stored_result:
                 try:
@@ -319,24 +347,11 @@ class JobQueue:
     def get_queue_stats(self) -> dict[str, Any]:
         """Gibt Statistiken über die Warteschlange zurück."""
 
-        # Aktive Jobs zählen
-        active_jobs = 0
-        queued_jobs = 0
-        completed_jobs = 0
-        failed_jobs = 0
-
-        for key in self.redis_client.scan_iter('job:*'):
-            job_data = self.redis_client.hgetall(key)
-            if job_data:
-                status = job_data.get(b'status', b'unknown').decode()
-                if status == 'queued':
-                    queued_jobs += 1
-                elif status == 'processing':
-                    active_jobs += 1
-                elif status == 'completed':
-                    completed_jobs += 1
-                elif status == 'failed':
-                    failed_jobs += 1
+        counts = json.loads(self._queue_stats_script(keys=[], args=[]))
+        active_jobs = counts['processing']
+        queued_jobs = counts['queued']
+        completed_jobs = counts['completed']
+        failed_jobs = counts['failed']
 
         return {
             'active_jobs': active_jobs,
@@ -394,22 +409,26 @@ class JobQueue:
         return estimated
 
 
-# Globale Queue-Instanz
-job_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
 
 
-def get_job_queue() -> JobQueue:
+@functools.cache
+def _make_queue() -> JobQueue | InMemoryJobQueue:
+    """Erzeugt die Job-Queue genau einmal pro Prozess."""
+    # Erlaube expliziten Fallback via ENV
+    use_fake = os.getenv('USE_FAKE_QUEUE', '').lower() in ('1', 'true', 'yes')
+    if use_fake or not QUEUE_AVAILABLE:
+        return InMemoryJobQueue()
+    # Versuche echte Queue, falle bei Fehlern zurück
+    try:
+        return JobQueue()
+    except (ImportError, ConnectionError):
+        return InMemoryJobQueue()
+
+
+def get_job_queue() -> JobQueue | InMemoryJobQueue:
     """Gibt die globale Job-Queue-Instanz zurück."""
-    global job_queue
-    if job_queue is None:
-        # Erlaube expliziten Fallback via ENV
-        use_fake = os.getenv('USE_FAKE_QUEUE', '').lower() in ('1', 'true', 'yes')
-        if use_fake:
-            job_queue = InMemoryJobQueue()
-            return job_queue
-        # Versuche echte Queue, falle bei Fehlern zurück
-        try:
-            job_queue = JobQueue()
-        except (ImportError, ConnectionError):
-            job_queue = InMemoryJobQueue()
-    return job_queue
+    # functools.cache verhindert keine parallelen Erstaufrufe; der Lock
+    # stellt sicher, dass Redis-Pool und Celery-App nur einmal entstehen
+    with _queue_lock:
+        return _make_queue()
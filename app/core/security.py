@@ -5,74 +5,166 @@ Security Middleware und Utilities.
 from __future__ import annotations
 
 import ipaddress
+import logging
+import re
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware import Middleware
 from starlette.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.logging import get_logger
 
 if TYPE_CHECKING:
-    from fastapi import Request, Response
+    from collections.abc import Iterable
 
-logger = get_logger('security')
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware für Security Headers und zusätzliche Sicherheitsmaßnahmen."""
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-    async def dispatch(self, request: Request, call_next):
-        """Verarbeitet Request und fügt Security Headers hinzu."""
+logger = get_logger('security')
+# Zugrundeliegender stdlib-Logger für Level-Prüfungen (funktioniert auch,
+# bevor structlog konfiguriert ist)
+_std_logger = logging.getLogger('security')
+
+# Maximale Request-Größe (Content-Length)
+_MAX_SIZE = settings.max_file_size
+
+# Security Headers einmalig vorkodiert (Content Security Policy, Frame-,
+# Sniffing-, XSS-, Referrer- und Permissions-Policy)
+_SECURITY_HEADERS_DEV: tuple[tuple[bytes, bytes], ...] = (
+    (
+        b'content-security-policy',
+        (
+            b"default-src 'self'; "
+            b"script-src 'self'; "
+            b"style-src 'self'; "
+            b"img-src 'self' data: https:; "
+            b"font-src 'self'; "
+            b"connect-src 'self'; "
+            b"frame-ancestors 'none';"
+        ),
+    ),
+    (b'x-frame-options', b'DENY'),
+    (b'x-content-type-options', b'nosniff'),
+    (b'x-xss-protection', b'1; mode=block'),
+    (b'referrer-policy', b'strict-origin-when-cross-origin'),
+    (
+        b'permissions-policy',
+        b'camera=(), microphone=(), geolocation=(), payment=()',
+    ),
+)
+# Strict-Transport-Security nur in Produktion (HTTPS)
+_SECURITY_HEADERS_PROD: tuple[tuple[bytes, bytes], ...] = (
+    *_SECURITY_HEADERS_DEV,
+    (b'strict-transport-security', b'max-age=31536000; includeSubDomains; preload'),
+)
+_SECURITY_HEADERS = (
+    _SECURITY_HEADERS_PROD
+    if settings.environment == 'production'
+    else _SECURITY_HEADERS_DEV
+)
+# Cache Control für sensitive Endpoints
+_NO_CACHE_HEADERS: tuple[tuple[bytes, bytes], ...] = (
+    (b'cache-control', b'no-cache, no-store, must-revalidate'),
+    (b'pragma', b'no-cache'),
+    (b'expires', b'0'),
+)
+
+# Verdächtige User-Agents, einmalig kompiliert und auf den Roh-Bytes geprüft
+_SUSPICIOUS_UA = re.compile(
+    rb'bot|crawler|spider|scraper|curl|wget|python-requests|sqlmap|nikto|nmap',
+    re.IGNORECASE,
+)
+
+
+def _hget(headers: Iterable[tuple[bytes, bytes]], name: bytes) -> bytes | None:
+    """Liest einen Header-Wert direkt aus den rohen ASGI-Headern."""
+    return next((value for key, value in headers if key == name), None)
+
+
+def _hstr(headers: Iterable[tuple[bytes, bytes]], name: bytes) -> str | None:
+    """Wie _hget, aber als String dekodiert."""
+    value = _hget(headers, name)
+    return value.decode('latin-1') if value is not None else None
+
+
+class CombinedSecurityMiddleware:
+    """Middleware für Security Headers, Request-Validierung und Audit-Logging."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Validiert den Request, fügt Security Headers hinzu und loggt Audit-Infos."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        # Logs nur erzeugen, wenn INFO überhaupt ausgegeben wird
+        log_info = _std_logger.isEnabledFor(logging.INFO)
+
+        if log_info:
+            # Audit-Log vor Request
+            self._log_audit_request(scope)
+            # Request-Logging für Security
+            self._log_security_request(scope)
+
+        path = scope['path']
+        extra_headers = (
+            _SECURITY_HEADERS + _NO_CACHE_HEADERS
+            if '/health' in path or '/metrics' in path
+            else _SECURITY_HEADERS
+        )
 
-        # Request-Logging für Security
-        self._log_security_request(request)
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                # Security Headers hinzufügen
+                message['headers'] = [*message.get('headers', ()), *extra_headers]
+                # Audit-Log nach Response
+                if log_info:
+                    self._log_audit_response(scope, message)
+            await send(message)
 
         # Security-Checks
-        if not self._validate_request_security(request):
-            return JSONResponse(
+        if not self._validate_request_security(scope):
+            response = JSONResponse(
                 status_code=400,
                 content={'error': 'Security validation failed'},
             )
+            await response(scope, receive, send_wrapper)
+            return
 
-        # Response verarbeiten
-        response = await call_next(request)
+        await self.app(scope, receive, send_wrapper)
 
-        # Security Headers hinzufügen
-        self._add_security_headers(response)
-
-        return response
-
-    def _log_security_request(self, request: Request) -> None:
+    def _log_security_request(self, scope: Scope) -> None:
         """Loggt Security-relevante Request-Informationen."""
+        headers = scope['headers']
+        client = scope.get('client')
         logger.info(
             'Security request log',
-            method=request.method,
-            url=str(request.url),
-            client_ip=request.client.host if request.client else None,
-            user_agent=request.headers.get('user-agent'),
-            content_length=request.headers.get('content-length'),
-            content_type=request.headers.get('content-type'),
+            method=scope['method'],
+            path=scope['path'],
+            client_ip=client[0] if client else None,
+            user_agent=_hstr(headers, b'user-agent'),
+            content_length=_hstr(headers, b'content-length'),
+            content_type=_hstr(headers, b'content-type'),
         )
 
-    def _validate_request_security(self, request: Request) -> bool:
+    def _validate_request_security(self, scope: Scope) -> bool:
         """Validiert Request auf Security-Probleme."""
+        headers = scope['headers']
 
-        # 1. Content-Length Check
-        try:
-            content_length = request.headers.get('content-length')
-            if content_length is not None:
-                size = int(content_length)
-                if size > settings.max_file_size:
-                    logger.warning('Request too large', size=size)
-                    return False
-        except ValueError:
-            pass
+        # 1. Content-Length Check (ungültige Werte werden ignoriert)
+        content_length = _hget(headers, b'content-length')
+        if content_length is not None and content_length.isdigit():
+            size = int(content_length)
+            if size > _MAX_SIZE:
+                logger.warning('Request too large', size=size)
+                return False
 
         # 2. Content-Type Check für Uploads
-        if request.method == 'POST' and '/extract' in str(request.url):
-            content_type = request.headers.get('content-type', '')
+        if scope['method'] == 'POST' and '/extract' in scope['path']:
+            content_type = _hstr(headers, b'content-type') or ''
             if not content_type.startswith('multipart/form-data'):
                 logger.warning(
                     'Invalid content-type for upload',
@@ -82,177 +174,50 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
                 return True
 
         # 3. User-Agent Check (optional)
-        user_agent = request.headers.get('user-agent', '')
+        user_agent = _hget(headers, b'user-agent') or b''
         if self._is_suspicious_user_agent(user_agent):
-            logger.warning('Suspicious user agent', user_agent=user_agent)
+            logger.warning(
+                'Suspicious user agent',
+                user_agent=user_agent.decode('latin-1'),
+            )
             # Nicht ablehnen, nur loggen
 
         # 4. Rate Limiting Check (wird in auth.py gehandhabt)
 
         return True
 
-    def _is_suspicious_user_agent(self, user_agent: str) -> bool:
+    def _is_suspicious_user_agent(self, user_agent: bytes) -> bool:
         """Prüft auf verdächtige User-Agents."""
-        suspicious_patterns = [
-            'bot',
-            'crawler',
-            'spider',
-            'scraper',
-            'curl',
-            'wget',
-            'python-requests',
-            'sqlmap',
-            'nikto',
-            'nmap',
-        ]
-
-        user_agent_lower = user_agent.lower()
-        return any(pattern in user_agent_lower for pattern in suspicious_patterns)
-
-    def _add_security_headers(self, response: Response) -> None:
-        """Fügt Security Headers zur Response hinzu."""
-
-        # Content Security Policy
-        response.headers['Content-Security-Policy'] = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self'; "
-            "connect-src 'self'; "
-            "frame-ancestors 'none';"
-        )
-
-        # X-Frame-Options
-        response.headers['X-Frame-Options'] = 'DENY'
-
-        # X-Content-Type-Options
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-
-        # X-XSS-Protection
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-
-        # Strict-Transport-Security (nur für HTTPS)
-        if settings.environment == 'production':
-            response.headers['Strict-Transport-Security'] = (
-                'max-age=31536000; includeSubDomains; preload'
-            )
-
-        # Referrer Policy
-        response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-
-        # Permissions Policy
-        response.headers['Permissions-Policy'] = (
-            'camera=(), microphone=(), geolocation=(), payment=()'
-        )
-
-        # Cache Control für sensitive Endpoints
-        try:
-            if hasattr(response, 'url') and response.url:
-                if '/health' in str(response.url) or '/metrics' in str(response.url):
-                    response.headers['Cache-Control'] = (
-                        'no-cache, no-store, must-revalidate'
-                    )
-                    response.headers['Pragma'] = 'no-cache'
-                    response.headers['Expires'] = '0'
-        except (AttributeError, RuntimeError):
-            # Ignore errors for responses without url attribute
-            pass
-
-
-class InputSanitizationMiddleware(BaseHTTPMiddleware):
-    """Middleware für Input-Sanitization."""
-
-    async def dispatch(self, request: Request, call_next):
-        """Sanitized Request-Input."""
-
-        sanitized_url = self._sanitize_url(str(request.url))
-        sanitized_headers = self._sanitize_headers(dict(request.headers))
-        try:
-            request.state.sanitized_url = sanitized_url
-            request.state.sanitized_headers = sanitized_headers
-        except AttributeError:
-            # Request-State nicht verfügbar (z. B. während Tests)
-            pass
-        return await call_next(request)
-
-    def _sanitize_url(self, url: str) -> str:
-        """Sanitized URL-Input."""
-        # Entferne gefährliche Zeichen
-        dangerous_chars = ['<', '>', '"', "'", '&']
-        for char in dangerous_chars:
-            url = url.replace(char, '')
-
-        return url
-
-    def _sanitize_headers(self, headers: dict) -> dict:
-        """Sanitized Header-Input."""
-        sanitized = {}
-
-        for key, value in headers.items():
-            # Sanitize Header-Werte
-            sanitized_value = self._sanitize_string(value)
-            sanitized[key] = sanitized_value
-
-        return sanitized
-
-    def _sanitize_string(self, value: str) -> str:
-        """Sanitized String-Input."""
-        # Entferne gefährliche Zeichen
-        dangerous_chars = ['<', '>', '"', "'", '&', ';', '(', ')']
-        for char in dangerous_chars:
-            value = value.replace(char, '')
-
-        return value
-
-
-class AuditLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware für Audit-Logging."""
-
-    async def dispatch(self, request: Request, call_next):
-        """Loggt Audit-Informationen."""
-
-        # Audit-Log vor Request
-        self._log_audit_request(request)
-
-        # Response verarbeiten
-        response = await call_next(request)
-
-        # Audit-Log nach Response
-        self._log_audit_response(request, response)
-
-        return response
+        return _SUSPICIOUS_UA.search(user_agent) is not None
 
-    def _log_audit_request(self, request: Request) -> None:
+    def _log_audit_request(self, scope: Scope) -> None:
         """Loggt Audit-Informationen für Request."""
+        headers = scope['headers']
+        client = scope.get('client')
         logger.info(
             'Audit request',
-            method=request.method,
-            url=str(request.url),
-            client_ip=request.client.host if request.client else None,
-            user_agent=request.headers.get('user-agent'),
-            timestamp=request.headers.get('x-request-id'),
+            method=scope['method'],
+            path=scope['path'],
+            client_ip=client[0] if client else None,
+            user_agent=_hstr(headers, b'user-agent'),
+            timestamp=_hstr(headers, b'x-request-id'),
         )
 
-    def _log_audit_response(self, request: Request, response: Response) -> None:
+    def _log_audit_response(self, scope: Scope, message: Message) -> None:
         """Loggt Audit-Informationen für Response."""
         logger.info(
             'Audit response',
-            method=request.method,
-            url=str(request.url),
-            status_code=response.status_code,
-            content_length=response.headers.get('content-length'),
-            timestamp=request.headers.get('x-request-id'),
+            method=scope['method'],
+            path=scope['path'],
+            status_code=message['status'],
+            content_length=_hstr(message.get('headers', ()), b'content-length'),
+            timestamp=_hstr(scope['headers'], b'x-request-id'),
         )
 
 
-def get_security_middleware() -> list:
+def get_security_middleware() -> list[Middleware]:
     """Gibt die Security Middleware-Liste zurück."""
-    return [
-        SecurityHeadersMiddleware,
-        InputSanitizationMiddleware,
-        AuditLoggingMiddleware,
-    ]
+    return [Middleware(CombinedSecurityMiddleware)]
 
 
 def ensure_safe_callback_url(callback_url: str | None) -> str | None:
@@ -6,12 +6,14 @@ from __future__ import annotations
 
 import hashlib
 import mimetypes
+import re
 import tempfile
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Final
 
 import magic
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -21,16 +23,89 @@ if TYPE_CHECKING:
 
 logger = get_logger('validation')
 
+# Gemeinsame libmagic-Instanz (Datenbank wird nur einmal geladen)
+_MIME_MAGIC = magic.Magic(mime=True)
+
+# Einfache Heuristiken für verdächtige Inhalte, als ein Muster kompiliert,
+# damit die Datei nur einmal durchlaufen wird
+_SUSPICIOUS_PATTERNS = re.compile(
+    b'|'.join(
+        re.escape(pattern)
+        for pattern in (
+            b'MZ',  # Windows Executable
+            b'PE\x00\x00',  # Portable Executable
+            b'ELF',  # Linux Executable
+            b'#!/bin/bash',  # Shell Script
+            b'<script',  # JavaScript in HTML
+            b'javascript:',  # JavaScript Protocol
+            b'vbscript:',  # VBScript Protocol
+            b'data:text/html',  # Data URI
+        )
+    ),
+)
+
+# Chunk-Größe für den Datei-Scan und nötige Überlappung zwischen Chunks
+_SCAN_CHUNK_SIZE = 64 * 1024
+_SCAN_OVERLAP = 14  # längstes Muster (b'data:text/html') - 1
+# Anzahl Bytes, die libmagic zur MIME-Erkennung bekommt
+_MIME_PROBE_SIZE = 4096
+
+# Datei-Signaturen (Magic Bytes) je Dateiendung; Endungen ohne Eintrag
+# (z.B. .txt) haben keine spezifische Signatur
+_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    '.pdf': (b'%PDF',),
+    '.docx': (b'PK\x03\x04',),  # ZIP-Signatur
+    '.xlsx': (b'PK\x03\x04',),  # ZIP-Signatur
+    '.pptx': (b'PK\x03\x04',),  # ZIP-Signatur
+    '.zip': (b'PK\x03\x04',),
+    '.jpg': (b'\xff\xd8\xff',),
+    '.jpeg': (b'\xff\xd8\xff',),
+    '.png': (b'\x89PNG\r\n\x1a\n',),
+    '.gif': (b'GIF87a', b'GIF89a'),
+    '.bmp': (b'BM',),
+    '.tiff': (b'II*\x00', b'MM\x00*'),
+    '.mp4': (b'\x00\x00\x00\x20ftyp',),
+    '.mp3': (b'ID3', b'\xff\xfb'),
+    '.wav': (b'RIFF',),
+    '.json': (b'{', b'['),
+    '.xml': (b'<?xml',),
+    '.html': (b'<!doctype', b'<html'),
+}
+# Endungen, deren Signatur ohne Groß-/Kleinschreibung verglichen wird
+_CASELESS_SIGNATURES = frozenset({'.html'})
+
+# Verdächtige Dateinamen
+_SUSP_NAMES = re.compile(
+    'virus|malware|trojan|backdoor|exploit|payload|shell|cmd|exec|run',
+    re.IGNORECASE,
+)
+
+
+def _copy_bounded(src: IO[bytes], dst: IO[bytes], limit: int) -> int:
+    """
+    Kopiert src blockweise nach dst, höchstens bis limit Bytes.
+
+    Returns:
+        Anzahl gelesener Bytes; ein Wert über limit bedeutet, dass die Kopie
+        abgebrochen wurde und dst unvollständig ist
+    """
+    buffer = bytearray(_SCAN_CHUNK_SIZE)
+    view = memoryview(buffer)
+    total = 0
+    while size := src.readinto(buffer):
+        total += size
+        if total > limit:
+            break
+        dst.write(view[:size])
+    return total
+
 
 class FileValidator:
     """Umfassende Datei-Validierung für Sicherheit und Integrität."""
 
-    def __init__(self):
-        self.allowed_extensions = set(settings.allowed_extensions)
-        self.max_file_size = settings.max_file_size
-
-        # Gefährliche MIME-Types
-        self.dangerous_mime_types = {
+    # Gefährliche MIME-Types
+    _DANGEROUS_MIME: Final[frozenset[str]] = frozenset(
+        {
             'application/x-executable',
             'application/x-msdownload',
             'application/x-msi',
@@ -38,10 +113,12 @@ class FileValidator:
             'application/x-msdos-windows',
             'application/x-ms-shortcut',
             'application/x-ms-wim',
-        }
+        },
+    )
 
-        # Erlaubte MIME-Types
-        self.allowed_mime_types = {
+    # Erlaubte MIME-Types
+    _ALLOWED_MIME: Final[frozenset[str]] = frozenset(
+        {
             # Dokumente
             'application/pdf',
             'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
@@ -90,7 +167,14 @@ class FileValidator:
             'application/x-7z-compressed',
             'application/x-tar',
             'application/gzip',
-        }
+        },
+    )
+
+    # Erlaubte Dateiendungen
+    _ALLOWED_EXTENSIONS: Final[frozenset[str]] = frozenset(settings.allowed_extensions)
+
+    def __init__(self):
+        self.max_file_size = settings.max_file_size
 
     async def validate_upload_file(
         self,
@@ -122,55 +206,54 @@ class FileValidator:
             file_path = Path(file.filename)
             extension = file_path.suffix.lower()
 
-            if extension not in self.allowed_extensions:
+            if extension not in self._ALLOWED_EXTENSIONS:
                 # Signalisiere 415 Unsupported Media Type via spezielle Nachricht
                 return False, f'UNSUPPORTED_EXTENSION:{extension}', None
 
             # 4. Temporäre Datei erstellen für weitere Validierung
-            total_size = 0
             await file.seek(0)
             with tempfile.NamedTemporaryFile(
                 delete=False,
                 suffix=extension,
             ) as temp_file:
-                while True:
-                    chunk = await file.read(1024 * 1024)
-                    if not chunk:
-                        break
-                    total_size += len(chunk)
-                    if total_size > self.max_file_size:
-                        temp_path = Path(temp_file.name)
-                        temp_file.close()
-                        temp_path.unlink(missing_ok=True)
-                        return (
-                            False,
-                            f'Datei zu groß. Maximum: {self.max_file_size} bytes',
-                            None,
-                        )
-                    temp_file.write(chunk)
+                # Upload direkt in die Temp-Datei streamen (ohne Kopie im Speicher),
+                # bei Überschreiten der Maximalgröße sofort abbrechen
+                total_size = await run_in_threadpool(
+                    _copy_bounded,
+                    file.file,
+                    temp_file,
+                    self.max_file_size,
+                )
                 temp_file_path = Path(temp_file.name)
 
+            if total_size > self.max_file_size:
+                temp_file_path.unlink(missing_ok=True)
+                return (
+                    False,
+                    f'Datei zu groß. Maximum: {self.max_file_size} bytes',
+                    None,
+                )
+
             try:
-                # 5. MIME-Type Validierung
-                mime_type = self._get_mime_type(temp_file_path)
+                # 5.-8. MIME-Type, Datei-Signatur, Malware-Scan (Basic) und Hash
+                # in einem Durchlauf über die Datei
+                mime_type, signature_ok, malware_ok, file_hash = self._scan_file(
+                    temp_file_path,
+                    extension,
+                )
                 if not self._is_mime_type_allowed(mime_type):
                     return False, f'Nicht erlaubter MIME-Type: {mime_type}', None
 
-                # 6. Datei-Signatur prüfen
-                if not self._validate_file_signature(temp_file_path, extension):
+                if not signature_ok:
                     return (
                         False,
                         'Datei-Signatur stimmt nicht mit Dateiendung überein',
                         None,
                     )
 
-                # 7. Malware-Scan (Basic)
-                if not self._basic_malware_scan(temp_file_path):
+                if not malware_ok:
                     return False, 'Datei wurde als verdächtig erkannt', None
 
-                # 8. Datei-Integrität prüfen
-                file_hash = self._calculate_file_hash(temp_file_path)
-
                 file_info = {
                     'filename': file.filename,
                     'size': total_size,
@@ -198,129 +281,105 @@ class FileValidator:
             logger.error('File validation error', error=str(e))
             return False, f'Validierungsfehler: {e!s}', None
 
-    def _get_mime_type(self, file_path: Path) -> str:
-        """Ermittelt den MIME-Type einer Datei."""
+    def _get_mime_type(self, header: bytes, extension: str) -> str:
+        """Ermittelt den MIME-Type aus den ersten Bytes einer Datei."""
         try:
             # Python-magic für präzise MIME-Type Erkennung
-            return magic.from_file(str(file_path), mime=True)
-        except (OSError, AttributeError):
-            # Fallback: mimetypes Modul
-            mime_type, _ = mimetypes.guess_type(str(file_path))
-            return mime_type or 'application/octet-stream'
+            return _MIME_MAGIC.from_buffer(header)
+        except (magic.MagicException, AttributeError):
+            # Fallback: mimetypes Modul anhand der Dateiendung
+            return mimetypes.types_map.get(extension, 'application/octet-stream')
 
     def _is_mime_type_allowed(self, mime_type: str) -> bool:
         """Prüft, ob ein MIME-Type erlaubt ist."""
-        if mime_type in self.dangerous_mime_types:
+        if mime_type in self._DANGEROUS_MIME:
             logger.warning('Dangerous MIME type detected', mime_type=mime_type)
             return False
 
-        if mime_type not in self.allowed_mime_types:
+        if mime_type not in self._ALLOWED_MIME:
             logger.warning('Unallowed MIME type', mime_type=mime_type)
             return False
 
         return True
 
-    def _validate_file_signature(self, file_path: Path, extension: str) -> bool:
-        """Validiert die Datei-Signatur (Magic Bytes)."""
+    def _scan_file(
+        self,
+        file_path: Path,
+        extension: str,
+    ) -> tuple[str, bool, bool, str]:
+        """
+        Prüft MIME-Type, Signatur, verdächtige Inhalte und Hash in einem Durchlauf.
+
+        Returns:
+            Tuple von (mime_type, signature_ok, malware_ok, sha256_hexdigest)
+        """
+        mime_type = None
         try:
-            with file_path.open('rb') as f:
-                header = f.read(16)  # Erste 16 Bytes lesen
-
-            # Datei-Signaturen (Magic Bytes)
-            signatures = {
-                '.pdf': b'%PDF',
-                '.docx': b'PK\x03\x04',  # ZIP-Signatur
-                '.xlsx': b'PK\x03\x04',  # ZIP-Signatur
-                '.pptx': b'PK\x03\x04',  # ZIP-Signatur
-                '.zip': b'PK\x03\x04',
-                '.jpg': b'\xff\xd8\xff',
-                '.jpeg': b'\xff\xd8\xff',
-                '.png': b'\x89PNG\r\n\x1a\n',
-                '.gif': b'GIF87a' or b'GIF89a',
-                '.bmp': b'BM',
-                '.tiff': b'II*\x00' or b'MM\x00*',
-                '.mp4': b'\x00\x00\x00\x20ftyp',
-                '.mp3': b'ID3' or b'\xff\xfb',
-                '.wav': b'RIFF',
-                '.json': b'{' or b'[',
-                '.xml': b'<?xml',
-                '.html': b'<!DOCTYPE' or b'<html' or b'<HTML',
-                '.txt': None,  # Keine spezifische Signatur
-            }
-
-            expected_signature = signatures.get(extension)
-            if expected_signature is None:
-                return True  # Keine Signatur definiert
-
-            return header.startswith(expected_signature)
+            sha256_hash = hashlib.sha256()
+            # Wiederverwendeter Puffer, ungepuffertes Lesen direkt per readinto
+            buffer = bytearray(_SCAN_CHUNK_SIZE)
+            view = memoryview(buffer)
+            tail = b''
+            with file_path.open('rb', buffering=0) as f:
+                while size := f.readinto(buffer):
+                    chunk = view[:size]
+                    if mime_type is None:
+                        header = bytes(chunk[:_MIME_PROBE_SIZE])
+                        mime_type = self._get_mime_type(header, extension)
+                        if not self._signature_matches(header[:16], extension):
+                            return mime_type, False, True, ''
+                        if self._is_suspicious_filename(file_path):
+                            return mime_type, True, False, ''
+
+                    # Chunk-Grenze (mit Überlappung) und Chunk selbst prüfen
+                    match = _SUSPICIOUS_PATTERNS.search(
+                        tail + chunk[:_SCAN_OVERLAP],
+                    ) or _SUSPICIOUS_PATTERNS.search(chunk)
+                    if match:
+                        logger.warning(
+                            'Suspicious pattern detected',
+                            pattern=str(match.group()),
+                        )
+                        return mime_type, True, False, ''
+                    tail = bytes(chunk[-_SCAN_OVERLAP:])
 
-        except (OSError, ValueError) as e:
-            logger.warning('File signature validation error', error=str(e))
-            return True  # Bei Fehlern erlauben
+                    sha256_hash.update(chunk)
 
-    def _basic_malware_scan(self, file_path: Path) -> bool:
-        """Führt einen Basic Malware-Scan durch."""
-        try:
-            with file_path.open('rb') as f:
-                content = f.read()
-
-            # Einfache Heuristiken für verdächtige Inhalte
-            suspicious_patterns = [
-                b'MZ',  # Windows Executable
-                b'PE\x00\x00',  # Portable Executable
-                b'ELF',  # Linux Executable
-                b'#!/bin/bash',  # Shell Script
-                b'<script',  # JavaScript in HTML
-                b'javascript:',  # JavaScript Protocol
-                b'vbscript:',  # VBScript Protocol
-                b'data:text/html',  # Data URI
-            ]
-
-            for pattern in suspicious_patterns:
-                if pattern in content:
-                    logger.warning('Suspicious pattern detected', pattern=str(pattern))
-                    return False
-
-            # Prüfe auf verdächtige Dateinamen
-            suspicious_names = [
-                'virus',
-                'malware',
-                'trojan',
-                'backdoor',
-                'exploit',
-                'payload',
-                'shell',
-                'cmd',
-                'exec',
-                'run',
-            ]
-
-            filename_lower = file_path.name.lower()
-            for suspicious in suspicious_names:
-                if suspicious in filename_lower:
-                    logger.warning(
-                        'Suspicious filename detected',
-                        filename=filename_lower,
-                    )
-                    return False
+            if mime_type is None:
+                # Leere Datei
+                mime_type = self._get_mime_type(b'', extension)
+                if not self._signature_matches(b'', extension):
+                    return mime_type, False, True, ''
+                if self._is_suspicious_filename(file_path):
+                    return mime_type, True, False, ''
 
-            return True
+            return mime_type, True, True, sha256_hash.hexdigest()
 
         except (OSError, ValueError) as e:
-            logger.warning('Malware scan error', error=str(e))
-            return True  # Bei Fehlern erlauben
+            logger.warning('File scan error', error=str(e))
+            # Bei Fehlern erlauben
+            return mime_type or self._get_mime_type(b'', extension), True, True, ''
 
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Berechnet den SHA-256 Hash einer Datei."""
-        try:
-            sha256_hash = hashlib.sha256()
-            with file_path.open('rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
-        except (OSError, ValueError) as e:
-            logger.warning('Hash calculation error', error=str(e))
-            return ''
+    def _is_suspicious_filename(self, file_path: Path) -> bool:
+        """Prüft auf verdächtige Dateinamen."""
+        if _SUSP_NAMES.search(file_path.name):
+            logger.warning(
+                'Suspicious filename detected',
+                filename=file_path.name.lower(),
+            )
+            return True
+        return False
+
+    def _signature_matches(self, header: bytes, extension: str) -> bool:
+        """Validiert die Datei-Signatur (Magic Bytes)."""
+        expected_signatures = _SIGNATURES.get(extension)
+        if expected_signatures is None:
+            return True  # Keine Signatur definiert
+
+        if extension in _CASELESS_SIGNATURES:
+            header = header.lower()
+
+        return header.startswith(expected_signatures)
 
     def cleanup_temp_file(self, temp_path: str) -> None:
         """Löscht eine temporäre Datei."""
@@ -2,65 +2,61 @@
 Factory für Datei-Extraktoren.
 """
 
+import importlib
+import threading
 from pathlib import Path
 
 import magic
 
 from app.extractors.base import BaseExtractor
 
+# Gemeinsame libmagic-Instanz (Datenbank wird nur einmal geladen)
+_MIME_MAGIC = magic.Magic(mime=True)
+
+# (Modul, Klasse, Priorität) der Extraktoren; niedrigere Zahl = höhere Priorität
+_EXTRACTOR_REGISTRY: tuple[tuple[str, str, int], ...] = (
+    ('app.extractors.docling_extractor', 'DoclingExtractor', 1),
+    ('app.extractors.text_extractor', 'TextExtractor', 5),
+    ('app.extractors.pdf_extractor', 'PDFExtractor', 6),
+    ('app.extractors.docx_extractor', 'DOCXExtractor', 7),
+    ('app.extractors.image_extractor', 'ImageExtractor', 12),
+    ('app.extractors.media_extractor', 'MediaExtractor', 15),
+)
+
 
 class ExtractorFactory:
     """Factory für Datei-Extraktoren."""
 
     def __init__(self):
         self.extractors: list[tuple[BaseExtractor, int]] = []  # (extractor, priority)
-        self._load_extractors()
+        # Dateiendung bzw. MIME-Type -> (priority, extractor) des Extraktors
+        # mit höchster Priorität
+        self._by_ext: dict[str, tuple[int, BaseExtractor]] = {}
+        self._by_mime: dict[str, tuple[int, BaseExtractor]] = {}
+        # Extraktor-Module (und ihre schweren Abhängigkeiten) erst bei
+        # Bedarf importieren
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self) -> None:
+        """Lädt die Extraktoren beim ersten Zugriff (thread-sicher)."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_extractors()
+                self._loaded = True
 
     def _load_extractors(self) -> None:
         """Lädt alle verfügbaren Extraktoren."""
-        # Docling-Extraktor als primärer Extraktor (falls verfügbar)
-        try:
-            from app.extractors.docling_extractor import DoclingExtractor
-
-            self._register_extractor(DoclingExtractor(), priority=1)  # Höhere Priorität
-        except ImportError:
-            pass
-
-        # Fallback-Extraktoren
-        try:
-            from app.extractors.text_extractor import TextExtractor
-
-            self._register_extractor(TextExtractor(), priority=5)
-        except ImportError:
-            pass
-
-        try:
-            from app.extractors.pdf_extractor import PDFExtractor
-
-            self._register_extractor(PDFExtractor(), priority=6)
-        except ImportError:
-            pass
-
-        try:
-            from app.extractors.docx_extractor import DOCXExtractor
-
-            self._register_extractor(DOCXExtractor(), priority=7)
-        except ImportError:
-            pass
-
-        try:
-            from app.extractors.image_extractor import ImageExtractor
-
-            self._register_extractor(ImageExtractor(), priority=12)
-        except ImportError:
-            pass
-
-        try:
-            from app.extractors.media_extractor import MediaExtractor
-
-            self._register_extractor(MediaExtractor(), priority=15)
-        except ImportError:
-            pass
+        # Docling als primärer Extraktor, danach die Fallback-Extraktoren
+        for module_path, class_name, priority in _EXTRACTOR_REGISTRY:
+            try:
+                module = importlib.import_module(module_path)
+                extractor = getattr(module, class_name)()
+            except ImportError:
+                continue
+            self._register_extractor(extractor, priority=priority)
 
         # Tika-Extraktor als letzter Fallback (optional)
         try:
@@ -78,16 +74,36 @@ class ExtractorFactory:
         self.extractors.append((extractor, priority))
         # Nach Priorität sortieren (niedrigere Zahl = höhere Priorität)
         self.extractors.sort(key=lambda x: x[1])
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """Baut die Nachschlagetabellen für Dateiendung und MIME-Type auf."""
+        self._by_ext.clear()
+        self._by_mime.clear()
+        for extractor, priority in self.extractors:
+            for ext in extractor.supported_extensions:
+                self._by_ext.setdefault(ext.lower(), (priority, extractor))
+            for mime_type in extractor.supported_mime_types:
+                self._by_mime.setdefault(mime_type, (priority, extractor))
 
     def get_extractor(self, file_path: Path) -> BaseExtractor | None:
         """Gibt den passenden Extraktor für eine Datei zurück."""
+        self._ensure_loaded()
         try:
             # MIME-Type ermitteln
-            mime_type = magic.from_file(str(file_path), mime=True)
+            mime_type = _MIME_MAGIC.from_file(str(file_path))
         except (OSError, AttributeError):
             mime_type = 'application/octet-stream'
 
-        # Extraktor mit höchster Priorität finden
+        # Extraktor mit höchster Priorität über Endung oder MIME-Type finden
+        by_mime = self._by_mime.get(mime_type)
+        by_ext = self._by_ext.get(file_path.suffix.lower())
+        if by_mime and by_ext:
+            return by_mime[1] if by_mime[0] <= by_ext[0] else by_ext[1]
+        if by_mime or by_ext:
+            return (by_mime or by_ext)[1]
+
+        # Extraktoren mit eigener Logik (z.B. Tika als generischer Fallback)
         for extractor, _priority in self.extractors:
             if extractor.can_extract(file_path, mime_type):
                 return extractor
@@ -96,10 +112,12 @@ class ExtractorFactory:
 
     def get_all_extractors(self) -> list[BaseExtractor]:
         """Gibt alle registrierten Extraktoren zurück."""
+        self._ensure_loaded()
         return [extractor for extractor, _ in self.extractors]
 
     def get_supported_formats(self) -> list[dict]:
         """Gibt alle unterstützten Formate zurück."""
+        self._ensure_loaded()
         formats = []
         for extractor, priority in self.extractors:
             formats.append(
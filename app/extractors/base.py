@@ -2,10 +2,23 @@
 Basis-Klasse für alle Datei-Extraktoren.
 """
 
+import asyncio
+import contextlib
+import functools
+import logging
+import multiprocessing
+import os
+import stat
+import threading
 import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar, Final
 
 from app.core.config import settings
 from app.core.exceptions import (
@@ -14,21 +27,193 @@ from app.core.exceptions import (
 )
 from app.core.logging import get_logger
 from app.models.schemas import (
+    BatchExtractionResult,
     ExtractedText,
     ExtractionResult,
     FileMetadata,
     StructuredData,
 )
 
+if TYPE_CHECKING:
+    import structlog
+
+# Anzahl Bytes, die libmagic zur MIME-Erkennung bekommt
+_MIME_PROBE_SIZE = 4096
+
+# Fehlertext und Log-Event je Extraktionsschritt (Metadaten, Text, Struktur)
+_STAGE_ERRORS: Final = (
+    ('Metadaten-Extraktion', 'Metadata extraction failed'),
+    ('Text-Extraktion', 'Text extraction failed'),
+    ('Struktur-Extraktion', 'Structure extraction failed'),
+)
+
+
+@functools.cache
+def _mime_magic() -> Any:
+    """Gemeinsame libmagic-Instanz (beim ersten Gebrauch geladen)."""
+    import magic
+
+    return magic.Magic(mime=True)
+
+
+@functools.cache
+def _stage_executor() -> ThreadPoolExecutor:
+    """Gemeinsamer Thread-Pool für die Extraktionsschritte von extract()."""
+    # Bis zu drei Schritte je paralleler Extraktion
+    return ThreadPoolExecutor(
+        max_workers=3 * settings.max_concurrent_extractions,
+        thread_name_prefix='extract-stage',
+    )
+
+
+# Prozess-Pools für Batch-Extraktionen, einer je Worker-Anzahl; sie bleiben
+# über Aufrufe hinweg bestehen, da spawn-Worker teuer zu starten sind
+_batch_pools: dict[int, ProcessPoolExecutor] = {}
+_batch_pools_lock = threading.Lock()
+
+
+def _batch_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Gemeinsamer Prozess-Pool für Batch-Extraktionen (bei Bedarf erzeugt)."""
+    with _batch_pools_lock:
+        pool = _batch_pools.get(max_workers)
+        if pool is None:
+            # spawn statt fork: der Elternprozess hält Thread-Pools und Locks
+            pool = _batch_pools[max_workers] = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return pool
+
+
+def _discard_batch_pool(max_workers: int, pool: ProcessPoolExecutor) -> None:
+    """Verwirft einen abgestürzten Pool, der nächste Aufruf erzeugt einen neuen."""
+    with _batch_pools_lock:
+        if _batch_pools.get(max_workers) is pool:
+            del _batch_pools[max_workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_batch(
+    extractor_cls: type['BaseExtractor'],
+    paths: list[Path],
+    max_workers: int,
+) -> tuple[ProcessPoolExecutor, list[Future[ExtractionResult]]]:
+    """Reicht die Dateien beim gemeinsamen Pool ein, ersetzt ihn falls abgestürzt."""
+    executor = _batch_pool(max_workers)
+    try:
+        futures = [
+            executor.submit(_extract_in_worker, extractor_cls, path) for path in paths
+        ]
+    except BrokenProcessPool:
+        _discard_batch_pool(max_workers, executor)
+        executor = _batch_pool(max_workers)
+        futures = [
+            executor.submit(_extract_in_worker, extractor_cls, path) for path in paths
+        ]
+    return executor, futures
+
+
+@functools.cache
+def _worker_extractor(extractor_cls: type['BaseExtractor']) -> 'BaseExtractor':
+    """Extraktor-Instanz pro Worker-Prozess (einmal je Klasse erzeugt)."""
+    return extractor_cls()
+
+
+def _extract_in_worker(
+    extractor_cls: type['BaseExtractor'],
+    file_path: Path,
+) -> ExtractionResult:
+    """Führt eine Extraktion in einem Worker-Prozess aus."""
+    return _worker_extractor(extractor_cls).extract(file_path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_mime(path: Path, _mtime_ns: int, _size: int) -> str:
+    """
+    Ermittelt den MIME-Type aus dem Dateianfang.
+
+    Änderungszeit und Größe sind Teil des Cache-Schlüssels, damit geänderte
+    Dateien neu erkannt werden.
+    """
+    # libmagic braucht nur den Dateianfang
+    with path.open('rb') as f:
+        header = f.read(_MIME_PROBE_SIZE)
+    return _mime_magic().from_buffer(header)
+
+
+class _SharedResults:
+    """Zwischenergebnisse, die sich die Schritte einer Extraktion teilen."""
+
+    __slots__ = ('_futures', '_lock')
+
+    def __init__(self):
+        self._futures: dict[Hashable, Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Liefert das Ergebnis zu key und berechnet es beim ersten Aufruf.
+
+        Gleichzeitige Aufrufe warten auf diese Berechnung und erhalten
+        dasselbe Ergebnis bzw. dieselbe Exception.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+
+# Geteilte Ergebnisse der laufenden Extraktion, gesetzt von _sharing()
+_shared_results: ContextVar[_SharedResults | None] = ContextVar(
+    'shared_results',
+    default=None,
+)
+
 
 class BaseExtractor(ABC):
     """Basis-Klasse für alle Datei-Extraktoren."""
 
+    # Unterklassen deklarieren eigene __slots__ für zusätzliche Attribute
+    __slots__ = (
+        '_effective_max_size',
+        '_ext_set',
+        '_mime_set',
+        '_supported_formats',
+        'max_file_size',
+        'supported_extensions',
+        'supported_mime_types',
+    )
+
+    # Logger werden einmal pro Klasse erzeugt, siehe __init_subclass__
+    logger: ClassVar['structlog.stdlib.BoundLogger']
+    # Für Level-Prüfungen; structlogs BoundLogger kennt kein isEnabledFor
+    _std_logger: ClassVar[logging.Logger]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        logger_name = f'extractor.{cls.__name__.lower()}'
+        cls.logger = get_logger(logger_name)
+        cls._std_logger = logging.getLogger(logger_name)
+
     def __init__(self):
         self.supported_extensions: list[str] = []
         self.supported_mime_types: list[str] = []
         self.max_file_size: int | None = None
-        self.logger = get_logger(f'extractor.{self.__class__.__name__.lower()}')
+        self._supported_formats: Mapping[str, Any] | None = None
+        self._ext_set: frozenset[str] | None = None
+        self._mime_set: frozenset[str] = frozenset()
+        self._effective_max_size: int | None = None
 
     @abstractmethod
     def can_extract(self, file_path: Path, mime_type: str) -> bool:
@@ -43,13 +228,31 @@ class BaseExtractor(ABC):
             True, wenn die Datei verarbeitet werden kann
         """
 
+    def _matches_format(self, file_path: Path, mime_type: str) -> bool:
+        """
+        Prüft Dateiendung und MIME-Type gegen die unterstützten Formate.
+
+        Die Listen werden beim ersten Aufruf in frozensets übernommen, da
+        Unterklassen sie erst nach BaseExtractor.__init__ befüllen.
+        """
+        if self._ext_set is None:
+            self._ext_set = frozenset(self.supported_extensions)
+            self._mime_set = frozenset(self.supported_mime_types)
+        return file_path.suffix.lower() in self._ext_set or mime_type in self._mime_set
+
     @abstractmethod
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """
         Extrahiert Metadaten aus der Datei.
 
         Args:
             file_path: Pfad zur Datei
+            st: Bereits ermittelter stat-Eintrag der Datei (optional)
 
         Returns:
             FileMetadata-Objekt mit den Metadaten
@@ -79,37 +282,57 @@ class BaseExtractor(ABC):
             StructuredData-Objekt mit den strukturierten Daten
         """
 
-    def validate_file(self, file_path: Path) -> None:
+    def validate_file(
+        self,
+        file_path: Path,
+        st: os.stat_result | None = None,
+    ) -> os.stat_result:
         """
         Validiert die Datei vor der Extraktion.
 
+        Existenz, Dateityp und Größe werden aus einem einzigen stat-Aufruf
+        geprüft.
+
         Args:
             file_path: Pfad zur Datei
+            st: Bereits ermittelter stat-Eintrag der Datei (optional)
+
+        Returns:
+            stat-Eintrag der Datei zur Wiederverwendung
 
         Raises:
             InvalidFileException: Wenn die Datei ungültig ist
             FileTooLargeException: Wenn die Datei zu groß ist
         """
-        if not file_path.exists():
-            raise InvalidFileException(
-                str(file_path),
-                'Datei existiert nicht',
-            )
-
-        if not file_path.is_file():
+        if st is None:
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
+                raise InvalidFileException(
+                    str(file_path),
+                    'Datei existiert nicht',
+                ) from None
+
+        if not stat.S_ISREG(st.st_mode):
             raise InvalidFileException(
                 str(file_path),
                 'Pfad ist keine Datei',
             )
 
-        file_size = file_path.stat().st_size
-        max_size = self.max_file_size or settings.max_file_size
+        file_size = st.st_size
+        # Beim ersten Aufruf festlegen, max_file_size setzen erst Unterklassen
+        max_size = self._effective_max_size
+        if max_size is None:
+            max_size = self.max_file_size or settings.max_file_size
+            self._effective_max_size = max_size
 
         if file_size > max_size:
             from app.core.exceptions import FileTooLargeException
 
             raise FileTooLargeException(file_size, max_size)
 
+        return st
+
     def extract(
         self,
         file_path: Path,
@@ -129,83 +352,407 @@ class BaseExtractor(ABC):
         Returns:
             ExtractionResult mit allen extrahierten Daten
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        deadline_ns = start_ns + settings.extract_timeout * 1_000_000_000
         warnings: list[str] = []
         errors: list[str] = []
-
-        # Logging für Extraktionsstart
-        self.logger.info(
-            'Extraction started',
-            filename=file_path.name,
-            file_size=file_path.stat().st_size,
-            include_metadata=include_metadata,
-            include_text=include_text,
-            include_structure=include_structure,
+        st = self._start_extraction(
+            file_path,
+            include_metadata,
+            include_text,
+            include_structure,
         )
 
         try:
             # Datei validieren
-            self.validate_file(file_path)
-
-            # Metadaten extrahieren
-            file_metadata = None
-            if include_metadata:
+            st = self.validate_file(file_path, st)
+
+            # Metadaten, Text und strukturierte Daten extrahieren; mehrere
+            # Schritte laufen parallel im Thread-Pool
+            stages = self._stages(
+                include_metadata,
+                include_text,
+                include_structure,
+                st,
+            )
+            # Die Schritte teilen sich Zwischenergebnisse, siehe _shared()
+            results = _SharedResults()
+            if sum(enabled for _, enabled in stages) > 1:
+                executor = _stage_executor()
+                futures = [
+                    executor.submit(self._run_stage, stage, file_path, results)
+                    if enabled
+                    else None
+                    for stage, enabled in stages
+                ]
                 try:
-                    file_metadata = self.extract_metadata(file_path)
-                except (OSError, ValueError, AttributeError, TypeError) as e:
-                    errors.append(f'Metadaten-Extraktion fehlgeschlagen: {e!s}')
-                    self.logger.warning(
-                        'Metadata extraction failed',
-                        filename=file_path.name,
-                        error=str(e),
+                    stage_results = [
+                        future.result(self._remaining(file_path, deadline_ns))
+                        if future
+                        else None
+                        for future in futures
+                    ]
+                except TimeoutError:
+                    for future in futures:
+                        if future:
+                            future.cancel()
+                    raise TimeoutException(
+                        str(file_path),
+                        settings.extract_timeout,
+                    ) from None
+            else:
+                stage_results = []
+                for stage, enabled in stages:
+                    if not enabled:
+                        stage_results.append(None)
+                        continue
+                    self._remaining(file_path, deadline_ns)
+                    stage_results.append(
+                        self._run_stage(stage, file_path, results),
                     )
-                    # Fallback-Metadaten erstellen
-                    file_metadata = self._create_fallback_metadata(file_path)
 
-            # Text extrahieren
-            extracted_text = None
-            if include_text:
-                try:
-                    extracted_text = self.extract_text(file_path)
-                except (OSError, ValueError, AttributeError, TypeError) as e:
-                    errors.append(f'Text-Extraktion fehlgeschlagen: {e!s}')
-                    self.logger.warning(
-                        'Text extraction failed',
-                        filename=file_path.name,
-                        error=str(e),
-                    )
+            # Optionale Verarbeitungsdauer simulieren für Tests
+            time.sleep(self._simulated_delay(st))
 
-            # Strukturierte Daten extrahieren
-            structured_data = None
-            if include_structure:
-                try:
-                    structured_data = self.extract_structured_data(file_path)
-                except (OSError, ValueError, AttributeError, TypeError) as e:
-                    errors.append(f'Struktur-Extraktion fehlgeschlagen: {e!s}')
-                    self.logger.warning(
-                        'Structure extraction failed',
-                        filename=file_path.name,
-                        error=str(e),
-                    )
+            return self._finish_extraction(
+                file_path,
+                st,
+                start_ns,
+                stage_results,
+                warnings,
+                errors,
+            )
+
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            return self._failed_extraction(
+                file_path,
+                st,
+                start_ns,
+                e,
+                warnings,
+                errors,
+            )
+
+    async def extract_async(
+        self,
+        file_path: Path,
+        include_metadata: bool = True,
+        include_text: bool = True,
+        include_structure: bool = False,
+    ) -> ExtractionResult:
+        """
+        Wie extract(), führt die angeforderten Extraktionsschritte aber
+        nebenläufig in Worker-Threads aus, ohne den Event-Loop zu blockieren.
+
+        Args:
+            file_path: Pfad zur Datei
+            include_metadata: Metadaten extrahieren
+            include_text: Text extrahieren
+            include_structure: Strukturierte Daten extrahieren
+
+        Returns:
+            ExtractionResult mit allen extrahierten Daten
+        """
+        start_ns = time.perf_counter_ns()
+        deadline_ns = start_ns + settings.extract_timeout * 1_000_000_000
+        warnings: list[str] = []
+        errors: list[str] = []
+        st = await asyncio.to_thread(
+            self._start_extraction,
+            file_path,
+            include_metadata,
+            include_text,
+            include_structure,
+        )
+
+        try:
+            # Datei validieren
+            st = self.validate_file(file_path, st)
+
+            # Metadaten, Text und strukturierte Daten parallel extrahieren;
+            # die Schritte teilen sich Zwischenergebnisse, siehe _shared()
+            results = _SharedResults()
+
+            async def run_stage(stage: Callable[[Path], Any], enabled: bool) -> Any:
+                if not enabled:
+                    return None
+                return await asyncio.to_thread(
+                    self._run_stage,
+                    stage,
+                    file_path,
+                    results,
+                )
+
+            # Erwartete Fehler fängt _run_stage ab, alles andere wird weitergereicht
+            try:
+                stage_results = await asyncio.wait_for(
+                    asyncio.gather(
+                        *(
+                            run_stage(stage, enabled)
+                            for stage, enabled in self._stages(
+                                include_metadata,
+                                include_text,
+                                include_structure,
+                                st,
+                            )
+                        ),
+                    ),
+                    self._remaining(file_path, deadline_ns),
+                )
+            except TimeoutError:
+                raise TimeoutException(
+                    str(file_path),
+                    settings.extract_timeout,
+                ) from None
+
+            # Optionale Verarbeitungsdauer simulieren für Tests
+            await asyncio.sleep(self._simulated_delay(st))
+
+            return await asyncio.to_thread(
+                self._finish_extraction,
+                file_path,
+                st,
+                start_ns,
+                stage_results,
+                warnings,
+                errors,
+            )
+
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            return await asyncio.to_thread(
+                self._failed_extraction,
+                file_path,
+                st,
+                start_ns,
+                e,
+                warnings,
+                errors,
+            )
+
+    async def convert_all(
+        self,
+        paths: list[Path],
+        parallel: int | None = None,
+    ) -> BatchExtractionResult:
+        """
+        Extrahiert mehrere Dateien parallel in Worker-Prozessen.
+
+        Args:
+            paths: Pfade der zu extrahierenden Dateien
+            parallel: Anzahl Worker-Prozesse (Standard: settings.worker_processes)
+
+        Returns:
+            BatchExtractionResult mit Ergebnissen und Fehlern je Datei
+        """
+        start_ns = time.perf_counter_ns()
+        max_workers = parallel or settings.worker_processes
+        executor, futures = _submit_batch(type(self), paths, max_workers)
+        outcomes = await asyncio.gather(
+            *(asyncio.wrap_future(future) for future in futures),
+            return_exceptions=True,
+        )
+        return self._batch_result(paths, outcomes, start_ns, max_workers, executor)
+
+    def convert_all_sync(
+        self,
+        paths: list[Path],
+        parallel: int | None = None,
+    ) -> BatchExtractionResult:
+        """
+        Synchrone Variante von convert_all().
+
+        Args:
+            paths: Pfade der zu extrahierenden Dateien
+            parallel: Anzahl Worker-Prozesse (Standard: settings.worker_processes)
+
+        Returns:
+            BatchExtractionResult mit Ergebnissen und Fehlern je Datei
+        """
+        start_ns = time.perf_counter_ns()
+        max_workers = parallel or settings.worker_processes
+        executor, futures = _submit_batch(type(self), paths, max_workers)
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:  # noqa: BLE001 - Fehler je Datei sammeln
+                outcomes.append(e)
+        return self._batch_result(paths, outcomes, start_ns, max_workers, executor)
+
+    def _batch_result(
+        self,
+        paths: list[Path],
+        outcomes: list[Any],
+        start_ns: int,
+        max_workers: int,
+        executor: ProcessPoolExecutor,
+    ) -> BatchExtractionResult:
+        """Ordnet die Ergebnisse einer Batch-Extraktion den Dateien zu."""
+        if any(isinstance(outcome, BrokenProcessPool) for outcome in outcomes):
+            _discard_batch_pool(max_workers, executor)
+
+        batch = BatchExtractionResult(
+            total_time=(time.perf_counter_ns() - start_ns) / 1e9,
+        )
+        for path, outcome in zip(paths, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                batch.failures[str(path)] = str(outcome)
+            else:
+                batch.results[str(path)] = outcome
+
+        self.logger.info(
+            'Batch extraction completed',
+            file_count=len(paths),
+            failed_count=len(batch.failures),
+            duration=batch.total_time,
+        )
+        return batch
+
+    def _stages(
+        self,
+        include_metadata: bool,
+        include_text: bool,
+        include_structure: bool,
+        st: os.stat_result,
+    ) -> tuple[tuple[Callable[[Path], Any], bool], ...]:
+        """
+        Extraktionsschritte in der Reihenfolge von _STAGE_ERRORS.
+
+        Der stat-Eintrag aus der Validierung wird an extract_metadata()
+        weitergereicht, damit die Datei nicht erneut abgefragt wird.
+        """
+        return (
+            (functools.partial(self.extract_metadata, st=st), include_metadata),
+            (self.extract_text, include_text),
+            (self.extract_structured_data, include_structure),
+        )
+
+    def _run_stage(
+        self,
+        stage: Callable[[Path], Any],
+        file_path: Path,
+        results: _SharedResults,
+    ) -> Any:
+        """
+        Führt einen Extraktionsschritt aus.
+
+        Erwartete Fehler werden nicht geworfen, sondern als Ergebnis
+        zurückgegeben und später in _finish_extraction() ausgewertet.
+        """
+        try:
+            with self._sharing(results):
+                return stage(file_path)
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            return e
 
-            # Optionale CPU-Last simulieren für Tests (linear mit Dateigröße)
-            if (
-                settings.simulate_processing
-                and not settings.environment == 'production'
-            ):
-                file_size_kb = max(1, file_path.stat().st_size // 1024)
-                # rudimentäre Last: einfache Schleife proportional zur Größe (verstärkt)
-                dummy = 0
-                for _ in range(min(file_size_kb * 2000, 1000000)):
-                    dummy += 1
+    @contextlib.contextmanager
+    def _sharing(self, results: _SharedResults | None = None) -> Iterator[None]:
+        """
+        Bereich, in dem _shared() Zwischenergebnisse wiederverwendet.
 
-            extraction_time = time.time() - start_time
+        extract() öffnet einen Bereich je Aufruf für alle Schritte; danach
+        werden die Ergebnisse verworfen.
+        """
+        token = _shared_results.set(
+            _SharedResults() if results is None else results,
+        )
+        try:
+            yield
+        finally:
+            _shared_results.reset(token)
 
-            # Timeout prüfen
-            if extraction_time > settings.extract_timeout:
-                raise TimeoutException(str(file_path), settings.extract_timeout)
+    def _shared(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Berechnet ein Zwischenergebnis einmal je Extraktion.
 
-            # Logging für erfolgreiche Extraktion
+        Parallele Schritte, die denselben Schlüssel anfragen, warten auf die
+        erste Berechnung. Außerhalb von _sharing() wird direkt berechnet.
+        """
+        results = _shared_results.get()
+        if results is None:
+            return compute()
+        return results.get(key, compute)
+
+    def _remaining(self, file_path: Path, deadline_ns: int) -> float:
+        """
+        Restzeit bis zur Deadline in Sekunden.
+
+        Raises:
+            TimeoutException: Wenn die Deadline bereits überschritten ist
+        """
+        remaining = (deadline_ns - time.perf_counter_ns()) / 1e9
+        if remaining <= 0:
+            raise TimeoutException(str(file_path), settings.extract_timeout)
+        return remaining
+
+    def _start_extraction(
+        self,
+        file_path: Path,
+        include_metadata: bool,
+        include_text: bool,
+        include_structure: bool,
+    ) -> os.stat_result | None:
+        """Ermittelt den stat-Eintrag der Datei und loggt den Extraktionsstart."""
+        # Einmaliger stat-Aufruf, wird an Validierung und Fallbacks weitergereicht
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            st = None
+
+        # Logging für Extraktionsstart
+        if self._std_logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                'Extraction started',
+                filename=file_path.name,
+                file_size=st.st_size if st else None,
+                include_metadata=include_metadata,
+                include_text=include_text,
+                include_structure=include_structure,
+            )
+        return st
+
+    def _simulated_delay(self, st: os.stat_result) -> float:
+        """Simulierte Verarbeitungsdauer für Tests (linear mit Dateigröße)."""
+        if settings.simulate_processing and not settings.environment == 'production':
+            file_size_kb = max(1, st.st_size // 1024)
+            return min(file_size_kb * 2e-6, 0.5)
+        return 0
+
+    def _finish_extraction(
+        self,
+        file_path: Path,
+        st: os.stat_result,
+        start_ns: int,
+        stage_results: list[Any],
+        warnings: list[str],
+        errors: list[str],
+    ) -> ExtractionResult:
+        """Wertet die Ergebnisse der Extraktionsschritte aus und baut das Ergebnis."""
+        results = list(stage_results)
+
+        # Fehlgeschlagene Schritte protokollieren
+        for i, (label, event) in enumerate(_STAGE_ERRORS):
+            if isinstance(results[i], Exception):
+                # Fehlermeldung nur einmal rendern
+                message = str(results[i])
+                errors.append(f'{label} fehlgeschlagen: {message}')
+                self.logger.warning(event, filename=file_path.name, error=message)
+                results[i] = None
+
+        file_metadata, extracted_text, structured_data = results
+
+        # Fallback-Metadaten erstellen
+        if isinstance(stage_results[0], Exception):
+            file_metadata = self._create_fallback_metadata(file_path, st)
+
+        extraction_time = (time.perf_counter_ns() - start_ns) / 1e9
+
+        # Timeout prüfen
+        if extraction_time > settings.extract_timeout:
+            raise TimeoutException(str(file_path), settings.extract_timeout)
+
+        # Logging für erfolgreiche Extraktion
+        if self._std_logger.isEnabledFor(logging.INFO):
             self.logger.info(
                 'Extraction completed',
                 filename=file_path.name,
@@ -217,60 +764,81 @@ class BaseExtractor(ABC):
                 errors_count=len(errors),
             )
 
-            return ExtractionResult(
-                success=len(errors) == 0,
-                file_metadata=file_metadata,
-                extracted_text=extracted_text,
-                structured_data=structured_data,
-                extraction_time=extraction_time,
-                warnings=warnings,
-                errors=errors,
-            )
-
-        except (OSError, ValueError, AttributeError, TypeError) as e:
-            extraction_time = time.time() - start_time
-            errors.append(f'Allgemeiner Extraktionsfehler: {e!s}')
+        return ExtractionResult(
+            success=len(errors) == 0,
+            file_metadata=file_metadata,
+            extracted_text=extracted_text,
+            structured_data=structured_data,
+            extraction_time=extraction_time,
+            warnings=warnings,
+            errors=errors,
+        )
 
-            # Logging für Extraktionsfehler
-            self.logger.error(
-                'Extraction failed',
-                filename=file_path.name,
-                error_type=type(e).__name__,
-                error_message=str(e),
-                duration=extraction_time,
-            )
+    def _failed_extraction(
+        self,
+        file_path: Path,
+        st: os.stat_result | None,
+        start_ns: int,
+        error: Exception,
+        warnings: list[str],
+        errors: list[str],
+    ) -> ExtractionResult:
+        """Baut das Ergebnis für eine fehlgeschlagene Extraktion."""
+        extraction_time = (time.perf_counter_ns() - start_ns) / 1e9
+        message = str(error)
+        errors.append(f'Allgemeiner Extraktionsfehler: {message}')
+
+        # Logging für Extraktionsfehler
+        self.logger.error(
+            'Extraction failed',
+            filename=file_path.name,
+            error_type=type(error).__name__,
+            error_message=message,
+            duration=extraction_time,
+        )
 
-            return ExtractionResult(
-                success=False,
-                file_metadata=self._create_fallback_metadata(file_path),
-                extraction_time=extraction_time,
-                warnings=warnings,
-                errors=errors,
-            )
-        except Exception as e:
-            # Re-raise unexpected exceptions to surface programming errors
-            raise
+        return ExtractionResult(
+            success=False,
+            file_metadata=self._create_fallback_metadata(file_path, st),
+            extraction_time=extraction_time,
+            warnings=warnings,
+            errors=errors,
+        )
 
-    def _create_fallback_metadata(self, file_path: Path) -> FileMetadata:
+    def _create_fallback_metadata(
+        self,
+        file_path: Path,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """Erstellt Fallback-Metadaten für eine Datei."""
-        import magic
+        if st is None:
+            st = file_path.stat()
 
         try:
-            mime_type = magic.from_file(str(file_path), mime=True)
+            mime_type = _detect_mime(file_path, st.st_mtime_ns, st.st_size)
         except (OSError, ValueError, AttributeError, TypeError):
             mime_type = 'application/octet-stream'
 
         return FileMetadata(
             filename=file_path.name,
-            file_size=file_path.stat().st_size,
+            file_size=st.st_size,
             file_type=mime_type,
             file_extension=file_path.suffix.lower(),
         )
 
-    def get_supported_formats(self) -> dict[str, Any]:
-        """Gibt Informationen über unterstützte Formate zurück."""
-        return {
-            'extensions': self.supported_extensions,
-            'mime_types': self.supported_mime_types,
-            'max_file_size': self.max_file_size,
-        }
+    def get_supported_formats(self) -> Mapping[str, Any]:
+        """
+        Gibt Informationen über unterstützte Formate zurück.
+
+        Die unveränderliche Ansicht wird beim ersten Aufruf erstellt und danach
+        wiederverwendet; die Formatlisten ändern sich nach __init__ nicht mehr.
+        """
+        if self._supported_formats is None:
+            self._supported_formats = MappingProxyType(
+                {
+                    'extensions': tuple(self.supported_extensions),
+                    'mime_types': tuple(self.supported_mime_types),
+                    'max_file_size': self.max_file_size,
+                },
+            )
+        return self._supported_formats
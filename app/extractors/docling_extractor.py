@@ -2,11 +2,159 @@
 Docling-basierter Extraktor für erweiterte Datenextraktion.
 """
 
+import enum
+import functools
+import importlib.util
+import os
+import threading
+from collections.abc import Callable, Mapping
 from datetime import UTC, datetime
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from typing import Any
 
 try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+
+    ORJSON_AVAILABLE = False
+
+from app.core.config import settings
+from app.extractors.base import BaseExtractor
+from app.models.schemas import (
+    ExtractedImage,
+    ExtractedText,
+    FileMetadata,
+    StructuredData,
+)
+
+# docling (und damit torch/onnxruntime) erst beim ersten Gebrauch importieren
+DOCLING_AVAILABLE = importlib.util.find_spec('docling') is not None
+
+
+class DoclingFeatures(enum.Flag):
+    """Auswahl der Docling-Extraktionsschritte für extract_all()."""
+
+    METADATA = enum.auto()
+    TEXT = enum.auto()
+    STRUCTURE = enum.auto()
+    ENTITIES = enum.auto()
+    SENTIMENT = enum.auto()
+    SUMMARY = enum.auto()
+    ALL = METADATA | TEXT | STRUCTURE | ENTITIES | SENTIMENT | SUMMARY
+
+
+# Analyse-Schritte, die settings.enable_advanced_analysis voraussetzen
+_ADVANCED_FEATURES = (
+    DoclingFeatures.ENTITIES | DoclingFeatures.SENTIMENT | DoclingFeatures.SUMMARY
+)
+
+# Skalare Metadatenfelder des docling Documents und ihr Zieltyp
+_METADATA_FIELDS: tuple[tuple[str, Callable[[Any], Any]], ...] = (
+    ('title', str),
+    ('author', str),
+    ('subject', str),
+    ('page_count', int),
+    ('duration', float),
+)
+
+# Datenformate, deren Text ohne docling direkt aus der Datei gelesen wird
+_DATA_FORMATS = frozenset({'.json', '.xml', '.html', '.htm', '.yaml', '.yml'})
+
+# MIME-Types nach Dateiendung
+_MIME_BY_EXT: Mapping[str, str] = MappingProxyType(
+    {
+        '.pdf': 'application/pdf',
+        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        '.doc': 'application/msword',
+        '.rtf': 'text/rtf',
+        '.odt': 'application/vnd.oasis.opendocument.text',
+        '.txt': 'text/plain',
+        '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        '.xls': 'application/vnd.ms-excel',
+        '.ods': 'application/vnd.oasis.opendocument.spreadsheet',
+        '.csv': 'text/csv',
+        '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        '.ppt': 'application/vnd.ms-powerpoint',
+        '.odp': 'application/vnd.oasis.opendocument.presentation',
+        '.json': 'application/json',
+        '.xml': 'application/xml',
+        '.html': 'text/html',
+        '.htm': 'text/html',
+        '.yaml': 'text/yaml',
+        '.yml': 'text/yaml',
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.png': 'image/png',
+        '.gif': 'image/gif',
+        '.bmp': 'image/bmp',
+        '.tiff': 'image/tiff',
+        '.tif': 'image/tiff',
+        '.webp': 'image/webp',
+    },
+)
+
+
+def _safe_get(
+    obj: Any,
+    attr: str,
+    cast: Callable[[Any], Any],
+    default: Any = None,
+) -> Any:
+    """Liest ein optionales Attribut des docling Documents und konvertiert es."""
+    value = getattr(obj, attr, None)
+    return default if value is None else cast(value)
+
+
+def _read_data_text(file_path: Path, suffix: str) -> str:
+    """
+    Liest den Text einer Datei in einem Datenformat ohne docling.
+
+    JSON wird normalisiert (eingerückt), HTML auf den sichtbaren Text reduziert;
+    XML und YAML werden unverändert übernommen.
+    """
+    raw = file_path.read_bytes()
+
+    if suffix == '.json':
+        try:
+            if ORJSON_AVAILABLE:
+                return orjson.dumps(
+                    orjson.loads(raw),
+                    option=orjson.OPT_INDENT_2,
+                ).decode()
+            return json.dumps(json.loads(raw), indent=2, ensure_ascii=False)
+        except ValueError:
+            pass  # Ungültiges JSON als Rohtext übernehmen
+
+    if suffix in ('.html', '.htm') and raw.strip():
+        from lxml import etree, html
+
+        try:
+            root = html.fromstring(raw)
+        except (ValueError, etree.ParserError):
+            pass
+        else:
+            # Skripte und Stylesheets gehören nicht zum sichtbaren Text
+            for element in root.xpath('//script | //style'):
+                element.drop_tree()
+            return root.text_content()
+
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+@functools.cache
+def _import_docling() -> SimpleNamespace:
+    """Importiert docling und die Enrichments (beim ersten Gebrauch)."""
+    # docling übernimmt das Gerät für Layout- und OCR-Modelle (CUDA über torch
+    # bzw. onnxruntime) aus DOCLING_DEVICE; eine gesetzte Variable hat Vorrang
+    os.environ.setdefault('DOCLING_DEVICE', settings.docling_device)
+
     # Check if Pipeline is available
     try:
         from docling import Document, Pipeline
@@ -41,65 +189,96 @@ try:
     except ImportError:
         # Create mock enrichments
         class MockEnrichment:
-            def __init__(self, name):
-                self.name = name
+            name = 'MockEnrichment'
 
             def enrich(self, doc):
                 return doc
 
-        def entity_enrichment():
-            return MockEnrichment('EntityEnrichment')
+        class EntityEnrichment(MockEnrichment):
+            name = 'EntityEnrichment'
 
-        def image_enrichment():
-            return MockEnrichment('ImageEnrichment')
+        class ImageEnrichment(MockEnrichment):
+            name = 'ImageEnrichment'
 
-        def language_enrichment():
-            return MockEnrichment('LanguageEnrichment')
+        class LanguageEnrichment(MockEnrichment):
+            name = 'LanguageEnrichment'
 
-        def link_enrichment():
-            return MockEnrichment('LinkEnrichment')
+        class LinkEnrichment(MockEnrichment):
+            name = 'LinkEnrichment'
 
-        def metadata_enrichment():
-            return MockEnrichment('MetadataEnrichment')
+        class MetadataEnrichment(MockEnrichment):
+            name = 'MetadataEnrichment'
 
-        def sentiment_enrichment():
-            return MockEnrichment('SentimentEnrichment')
+        class SentimentEnrichment(MockEnrichment):
+            name = 'SentimentEnrichment'
 
-        def structure_enrichment():
-            return MockEnrichment('StructureEnrichment')
+        class StructureEnrichment(MockEnrichment):
+            name = 'StructureEnrichment'
 
-        def summary_enrichment():
-            return MockEnrichment('SummaryEnrichment')
+        class SummaryEnrichment(MockEnrichment):
+            name = 'SummaryEnrichment'
 
-        def table_enrichment():
-            return MockEnrichment('TableEnrichment')
+        class TableEnrichment(MockEnrichment):
+            name = 'TableEnrichment'
 
-        def text_enrichment():
-            return MockEnrichment('TextEnrichment')
+        class TextEnrichment(MockEnrichment):
+            name = 'TextEnrichment'
 
-    DOCLING_AVAILABLE = True
-except ImportError:
-    DOCLING_AVAILABLE = False
+    return SimpleNamespace(
+        Document=Document,
+        Pipeline=Pipeline,
+        EntityEnrichment=EntityEnrichment,
+        ImageEnrichment=ImageEnrichment,
+        LanguageEnrichment=LanguageEnrichment,
+        LinkEnrichment=LinkEnrichment,
+        MetadataEnrichment=MetadataEnrichment,
+        SentimentEnrichment=SentimentEnrichment,
+        StructureEnrichment=StructureEnrichment,
+        SummaryEnrichment=SummaryEnrichment,
+        TableEnrichment=TableEnrichment,
+        TextEnrichment=TextEnrichment,
+    )
 
-from app.core.config import settings
-from app.extractors.base import BaseExtractor
-from app.models.schemas import (
-    ExtractedImage,
-    ExtractedText,
-    FileMetadata,
-    StructuredData,
-)
+
+def _process_doc(pipeline: Any, path: Path) -> Any:
+    """Parst eine Datei und führt die docling Pipeline darauf aus."""
+    return pipeline.process(_import_docling().Document.from_file(str(path)))
+
+
+class _SerializedEnrichment:
+    """
+    Gemeinsam genutztes Enrichment, dessen Aufrufe serialisiert werden.
+
+    Die docling Enrichments sind nicht als thread-sicher dokumentiert, dieselbe
+    Instanz wird aber von mehreren Pipelines und parallelen Extraktionen genutzt.
+    """
+
+    __slots__ = ('_enrichment', '_lock')
+
+    def __init__(self, enrichment: Any):
+        self._enrichment = enrichment
+        self._lock = threading.Lock()
+
+    def enrich(self, doc: Any) -> Any:
+        with self._lock:
+            return self._enrichment.enrich(doc)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._enrichment, name)
 
 
 class DoclingExtractor(BaseExtractor):
     """Docling-basierter Extraktor für erweiterte Datenextraktion."""
 
+    __slots__ = ('_enrichments', '_pipeline_lock', '_pipelines', 'pipeline')
+
     def __init__(self):
         super().__init__()
         if not DOCLING_AVAILABLE:
             raise ImportError(
                 'docling ist nicht installiert. Installieren Sie es mit: uv add docling',
             )
+        _import_docling()
 
         # Unterstützte Formate (docling kann viele Formate verarbeiten)
         self.supported_extensions = [
@@ -168,19 +347,27 @@ class DoclingExtractor(BaseExtractor):
         ]
         self.max_file_size = settings.max_file_size
 
-        # Docling Pipeline konfigurieren
-        self.pipeline = self._create_pipeline()
+        # Docling Pipeline konfigurieren; die Enrichments (und ihre Modelle)
+        # werden einmal erzeugt und von allen Pipelines gemeinsam genutzt
+        self._enrichments: dict[type, Any] = {}
+        self._pipelines: dict[DoclingFeatures, Any] = {}
+        self._pipeline_lock = threading.Lock()
+        with self._pipeline_lock:
+            self.pipeline = self._create_pipeline()
 
     def can_extract(self, file_path: Path, mime_type: str) -> bool:
         """Prüft, ob der Extraktor die Datei verarbeiten kann."""
-        return (
-            file_path.suffix.lower() in self.supported_extensions
-            or mime_type in self.supported_mime_types
-        )
-
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
+        return self._matches_format(file_path, mime_type)
+
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """Extrahiert Metadaten mit docling."""
-        stat = file_path.stat()
+        stat = file_path.stat() if st is None else st
 
         metadata = FileMetadata(
             filename=file_path.name,
@@ -192,43 +379,30 @@ class DoclingExtractor(BaseExtractor):
         )
 
         try:
-            # Docling Document erstellen
-            doc = Document.from_file(str(file_path))
-
-            # Metadaten-Extraktion
-            metadata_enrichment = MetadataEnrichment()
-            enriched_doc = metadata_enrichment.enrich(doc)
+            # Verarbeitetes Docling Document
+            enriched_doc = self._process(file_path, features=features)
 
             # Docling-Metadaten extrahieren
-            if hasattr(enriched_doc, 'metadata'):
-                doc_metadata = enriched_doc.metadata
-
-                if 'title' in doc_metadata:
-                    metadata.title = str(doc_metadata['title'])
-                if 'author' in doc_metadata:
-                    metadata.author = str(doc_metadata['author'])
-                if 'subject' in doc_metadata:
-                    metadata.subject = str(doc_metadata['subject'])
-                if 'keywords' in doc_metadata:
-                    if isinstance(doc_metadata['keywords'], list):
-                        metadata.keywords = [str(k) for k in doc_metadata['keywords']]
+            doc_metadata = getattr(enriched_doc, 'metadata', None)
+            if doc_metadata is not None:
+                # Titel, Autor, Thema, Seitenanzahl, Dauer (für Medien)
+                for key, cast in _METADATA_FIELDS:
+                    value = doc_metadata.get(key)
+                    if value is not None:
+                        setattr(metadata, key, cast(value))
+
+                keywords = doc_metadata.get('keywords')
+                if keywords is not None:
+                    if isinstance(keywords, list):
+                        metadata.keywords = [str(k) for k in keywords]
                     else:
-                        metadata.keywords = [str(doc_metadata['keywords'])]
-
-                # Seitenanzahl
-                if 'page_count' in doc_metadata:
-                    metadata.page_count = int(doc_metadata['page_count'])
+                        metadata.keywords = [str(keywords)]
 
                 # Dimensionen (für Bilder)
-                if 'width' in doc_metadata and 'height' in doc_metadata:
-                    metadata.dimensions = {
-                        'width': int(doc_metadata['width']),
-                        'height': int(doc_metadata['height']),
-                    }
-
-                # Dauer (für Medien)
-                if 'duration' in doc_metadata:
-                    metadata.duration = float(doc_metadata['duration'])
+                width = doc_metadata.get('width')
+                height = doc_metadata.get('height')
+                if width is not None and height is not None:
+                    metadata.dimensions = {'width': int(width), 'height': int(height)}
 
         except (ValueError, AttributeError, TypeError):
             # Fallback zu Basis-Metadaten
@@ -236,44 +410,42 @@ class DoclingExtractor(BaseExtractor):
 
         return metadata
 
-    def extract_text(self, file_path: Path) -> ExtractedText:
+    def extract_text(
+        self,
+        file_path: Path,
+        *,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> ExtractedText:
         """Extrahiert Text mit docling."""
         content = ''
         language = None
         confidence = 1.0
         ocr_used = False
 
-        try:
-            # Docling Document erstellen
-            doc = Document.from_file(str(file_path))
-
-            # Text-Extraktion
-            text_enrichment = TextEnrichment()
-            enriched_doc = text_enrichment.enrich(doc)
-
-            # Text extrahieren
-            if hasattr(enriched_doc, 'text') and enriched_doc.text:
-                content = enriched_doc.text
-            elif hasattr(enriched_doc, 'content') and enriched_doc.content:
-                content = enriched_doc.content
-
-            # Sprache erkennen
-            language_enrichment = LanguageEnrichment()
-            lang_doc = language_enrichment.enrich(enriched_doc)
-
-            if hasattr(lang_doc, 'language'):
-                language = str(lang_doc.language)
-
-            # OCR-Status prüfen
-            if hasattr(enriched_doc, 'ocr_used'):
-                ocr_used = bool(enriched_doc.ocr_used)
-
-            # Konfidenz
-            if hasattr(enriched_doc, 'confidence'):
-                confidence = float(enriched_doc.confidence)
-
-        except (ValueError, AttributeError, TypeError):
-            pass
+        suffix = file_path.suffix.lower()
+        if suffix in _DATA_FORMATS:
+            # Datenformate brauchen keine docling Pipeline
+            content = _read_data_text(file_path, suffix)
+        else:
+            try:
+                # Verarbeitetes Docling Document
+                enriched_doc = self._process(file_path, features=features)
+
+                # Text extrahieren
+                content = (
+                    getattr(enriched_doc, 'text', None)
+                    or getattr(enriched_doc, 'content', None)
+                    or ''
+                )
+
+                # Sprache (aus der LanguageEnrichment der Pipeline)
+                language = _safe_get(enriched_doc, 'language', str)
+                # OCR-Status und Konfidenz
+                ocr_used = _safe_get(enriched_doc, 'ocr_used', bool, default=False)
+                confidence = _safe_get(enriched_doc, 'confidence', float, default=1.0)
+
+            except (ValueError, AttributeError, TypeError):
+                pass
 
         # Statistiken berechnen
         word_count = len(content.split()) if content else 0
@@ -289,7 +461,12 @@ class DoclingExtractor(BaseExtractor):
             ocr_confidence=confidence if ocr_used else None,
         )
 
-    def extract_structured_data(self, file_path: Path) -> StructuredData:
+    def extract_structured_data(
+        self,
+        file_path: Path,
+        *,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> StructuredData:
         """Extrahiert strukturierte Daten mit docling."""
         tables = []
         headings = []
@@ -298,51 +475,39 @@ class DoclingExtractor(BaseExtractor):
         lists = []
 
         try:
-            # Docling Document erstellen
-            doc = Document.from_file(str(file_path))
-
-            # Struktur-Extraktion
-            structure_enrichment = StructureEnrichment()
-            enriched_doc = structure_enrichment.enrich(doc)
+            # Verarbeitetes Docling Document
+            enriched_doc = self._process(file_path, features=features)
 
             # Tabellen extrahieren
-            table_enrichment = TableEnrichment()
-            table_doc = table_enrichment.enrich(enriched_doc)
-
-            if hasattr(table_doc, 'tables') and table_doc.tables:
-                for table in table_doc.tables:
-                    table_data = {
-                        'headers': table.get('headers', []),
-                        'rows': table.get('rows', []),
-                        'row_count': len(table.get('rows', [])),
-                        'column_count': len(table.get('headers', [])),
-                    }
-                    tables.append(table_data)
+            for table in getattr(enriched_doc, 'tables', None) or ():
+                headers = table.get('headers', [])
+                rows = table.get('rows', [])
+                tables.append(
+                    {
+                        'headers': headers,
+                        'rows': rows,
+                        'row_count': len(rows),
+                        'column_count': len(headers),
+                    },
+                )
 
             # Überschriften extrahieren
-            if hasattr(enriched_doc, 'headings') and enriched_doc.headings:
-                for heading in enriched_doc.headings:
-                    heading_data = {
-                        'level': heading.get('level', 1),
-                        'text': heading.get('text', ''),
-                        'position': heading.get('position', 0),
-                    }
-                    headings.append(heading_data)
+            headings = [
+                {
+                    'level': heading.get('level', 1),
+                    'text': heading.get('text', ''),
+                    'position': heading.get('position', 0),
+                }
+                for heading in getattr(enriched_doc, 'headings', None) or ()
+            ]
 
             # Links extrahieren
-            link_enrichment = LinkEnrichment()
-            link_doc = link_enrichment.enrich(enriched_doc)
-
-            if hasattr(link_doc, 'links') and link_doc.links:
-                links = [str(link) for link in link_doc.links]
+            links = [str(link) for link in getattr(enriched_doc, 'links', None) or ()]
 
             # Bilder extrahieren
-            image_enrichment = ImageEnrichment()
-            image_doc = image_enrichment.enrich(enriched_doc)
-
-            if hasattr(image_doc, 'images') and image_doc.images:
-                for i, img in enumerate(image_doc.images):
-                    image_data = ExtractedImage(
+            for i, img in enumerate(getattr(enriched_doc, 'images', None) or ()):
+                images.append(
+                    ExtractedImage(
                         image_index=i,
                         image_type=img.get('type', 'unknown'),
                         dimensions={
@@ -352,14 +517,15 @@ class DoclingExtractor(BaseExtractor):
                         file_size=img.get('size', 0),
                         extracted_text=img.get('text'),
                         ocr_confidence=img.get('confidence'),
-                    )
-                    images.append(image_data)
+                    ),
+                )
 
             # Listen extrahieren
-            if hasattr(enriched_doc, 'lists') and enriched_doc.lists:
-                for list_data in enriched_doc.lists:
-                    if isinstance(list_data, list):
-                        lists.append([str(item) for item in list_data])
+            lists = [
+                [str(item) for item in list_data]
+                for list_data in getattr(enriched_doc, 'lists', None) or ()
+                if isinstance(list_data, list)
+            ]
 
         except (ValueError, AttributeError, TypeError):
             pass
@@ -372,47 +538,43 @@ class DoclingExtractor(BaseExtractor):
             lists=lists,
         )
 
-    def extract_entities(self, file_path: Path) -> dict[str, Any]:
+    def extract_entities(
+        self,
+        file_path: Path,
+        *,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> dict[str, Any]:
         """Extrahiert Entitäten mit docling."""
         entities = {}
 
         try:
-            doc = Document.from_file(str(file_path))
-
-            # Text extrahieren
-            text_enrichment = TextEnrichment()
-            enriched_doc = text_enrichment.enrich(doc)
-
-            # Entitäten extrahieren
-            entity_enrichment = EntityEnrichment()
-            entity_doc = entity_enrichment.enrich(enriched_doc)
+            # Verarbeitetes Docling Document
+            entity_doc = self._process(file_path, features=features)
 
-            if hasattr(entity_doc, 'entities') and entity_doc.entities:
-                for entity_type, entity_list in entity_doc.entities.items():
-                    entities[entity_type] = [str(entity) for entity in entity_list]
+            doc_entities = getattr(entity_doc, 'entities', None) or {}
+            for entity_type, entity_list in doc_entities.items():
+                entities[entity_type] = [str(entity) for entity in entity_list]
 
         except (ValueError, AttributeError, TypeError):
             pass
 
         return entities
 
-    def extract_sentiment(self, file_path: Path) -> dict[str, Any]:
+    def extract_sentiment(
+        self,
+        file_path: Path,
+        *,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> dict[str, Any]:
         """Extrahiert Sentiment-Analyse mit docling."""
         sentiment_data = {}
 
         try:
-            doc = Document.from_file(str(file_path))
-
-            # Text extrahieren
-            text_enrichment = TextEnrichment()
-            enriched_doc = text_enrichment.enrich(doc)
-
-            # Sentiment-Analyse
-            sentiment_enrichment = SentimentEnrichment()
-            sentiment_doc = sentiment_enrichment.enrich(enriched_doc)
+            # Verarbeitetes Docling Document
+            sentiment_doc = self._process(file_path, features=features)
 
-            if hasattr(sentiment_doc, 'sentiment'):
-                sentiment = sentiment_doc.sentiment
+            sentiment = getattr(sentiment_doc, 'sentiment', None)
+            if sentiment is not None:
                 sentiment_data = {
                     'overall_sentiment': sentiment.get('overall', 'neutral'),
                     'sentiment_score': sentiment.get('score', 0.0),
@@ -425,100 +587,201 @@ class DoclingExtractor(BaseExtractor):
 
         return sentiment_data
 
-    def extract_summary(self, file_path: Path) -> str:
+    def extract_summary(
+        self,
+        file_path: Path,
+        *,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> str:
         """Extrahiert Zusammenfassung mit docling."""
         summary = ''
 
         try:
-            doc = Document.from_file(str(file_path))
+            # Verarbeitetes Docling Document
+            summary_doc = self._process(file_path, features=features)
 
-            # Text extrahieren
-            text_enrichment = TextEnrichment()
-            enriched_doc = text_enrichment.enrich(doc)
-
-            # Zusammenfassung erstellen
-            summary_enrichment = SummaryEnrichment()
-            summary_doc = summary_enrichment.enrich(enriched_doc)
-
-            if hasattr(summary_doc, 'summary'):
-                summary = str(summary_doc.summary)
+            summary = _safe_get(summary_doc, 'summary', str, default='')
 
         except (ValueError, AttributeError, TypeError):
             pass
 
         return summary
 
-    def _create_pipeline(self) -> Pipeline:
-        """Erstellt eine docling Pipeline."""
-        pipeline = Pipeline()
-
-        # Basis-Enrichments hinzufügen
-        pipeline.add_enrichment(TextEnrichment())
-        pipeline.add_enrichment(MetadataEnrichment())
-        pipeline.add_enrichment(StructureEnrichment())
-        pipeline.add_enrichment(TableEnrichment())
-        pipeline.add_enrichment(ImageEnrichment())
-        pipeline.add_enrichment(LinkEnrichment())
-        pipeline.add_enrichment(LanguageEnrichment())
-
-        # Optionale Enrichments
-        if settings.enable_advanced_analysis:
-            pipeline.add_enrichment(EntityEnrichment())
-            pipeline.add_enrichment(SentimentEnrichment())
-            pipeline.add_enrichment(SummaryEnrichment())
+    def extract_all(
+        self,
+        file_path: Path,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> dict[str, Any]:
+        """
+        Führt die gewählten Extraktionen für eine Datei aus.
+
+        Die Datei wird dabei nur einmal geparst; die Pipeline enthält nur die
+        Enrichments, die für die gewählten Schritte nötig sind.
+
+        Args:
+            file_path: Pfad zur Datei
+            features: Auszuführende Extraktionsschritte
+
+        Returns:
+            Dictionary mit den Ergebnissen der gewählten Schritte
+        """
+        if not settings.enable_advanced_analysis:
+            features &= ~_ADVANCED_FEATURES
+
+        steps = (
+            (DoclingFeatures.METADATA, 'metadata', self.extract_metadata),
+            (DoclingFeatures.TEXT, 'text', self.extract_text),
+            (DoclingFeatures.STRUCTURE, 'structure', self.extract_structured_data),
+            (DoclingFeatures.ENTITIES, 'entities', self.extract_entities),
+            (DoclingFeatures.SENTIMENT, 'sentiment', self.extract_sentiment),
+            (DoclingFeatures.SUMMARY, 'summary', self.extract_summary),
+        )
+        # Alle Schritte teilen sich einen Pipeline-Lauf, siehe _process()
+        with self._sharing():
+            return {
+                key: step(file_path, features=features)
+                for feature, key, step in steps
+                if feature in features
+            }
+
+    def _stages(
+        self,
+        include_metadata: bool,
+        include_text: bool,
+        include_structure: bool,
+        st: os.stat_result,
+    ) -> tuple[tuple[Callable[[Path], Any], bool], ...]:
+        """
+        Extraktionsschritte für extract() in der Reihenfolge von BaseExtractor.
+
+        Alle Schritte nutzen eine Pipeline, die nur die Enrichments der
+        angeforderten Schritte enthält, und teilen sich damit einen Lauf.
+        """
+        features = DoclingFeatures(0)
+        for feature, enabled in (
+            (DoclingFeatures.METADATA, include_metadata),
+            (DoclingFeatures.TEXT, include_text),
+            (DoclingFeatures.STRUCTURE, include_structure),
+        ):
+            if enabled:
+                features |= feature
+
+        return (
+            (
+                functools.partial(self.extract_metadata, st=st, features=features),
+                include_metadata,
+            ),
+            (functools.partial(self.extract_text, features=features), include_text),
+            (
+                functools.partial(self.extract_structured_data, features=features),
+                include_structure,
+            ),
+        )
 
+    def _process(
+        self,
+        file_path: Path,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> Any:
+        """
+        Gibt das von der Pipeline verarbeitete Document der Datei zurück.
+
+        Alle benötigten Enrichments laufen in einem Durchlauf; die Schritte
+        einer Extraktion teilen sich das Ergebnis, sofern der Docling-Cache
+        aktiviert ist.
+        """
+        pipeline = self._pipeline_for(features)
+        process = functools.partial(_process_doc, pipeline, file_path)
+        if not settings.docling_cache_enabled:
+            return process()
+        return self._shared(('docling', pipeline, file_path), process)
+
+    def _pipeline_for(self, features: DoclingFeatures) -> Any:
+        """Gibt die (einmal erzeugte) Pipeline für die gewählten Schritte zurück."""
+        if features == DoclingFeatures.ALL:
+            return self.pipeline
+        pipeline = self._pipelines.get(features)
+        if pipeline is None:
+            with self._pipeline_lock:
+                pipeline = self._pipelines.get(features)
+                if pipeline is None:
+                    pipeline = self._create_pipeline(features)
+                    self._pipelines[features] = pipeline
+        return pipeline
+
+    def _create_pipeline(
+        self,
+        features: DoclingFeatures = DoclingFeatures.ALL,
+    ) -> Any:
+        """
+        Erstellt eine docling Pipeline mit den Enrichments der gewählten Schritte.
+
+        Muss unter _pipeline_lock aufgerufen werden, da die Enrichments dabei
+        einmalig erzeugt werden.
+        """
+        text_based = (
+            DoclingFeatures.TEXT
+            | DoclingFeatures.ENTITIES
+            | DoclingFeatures.SENTIMENT
+            | DoclingFeatures.SUMMARY
+        )
+        dl = _import_docling()
+        enrichments = (
+            # Basis-Enrichments
+            (dl.TextEnrichment, text_based),
+            (dl.MetadataEnrichment, DoclingFeatures.METADATA),
+            (dl.StructureEnrichment, DoclingFeatures.STRUCTURE),
+            (dl.TableEnrichment, DoclingFeatures.STRUCTURE),
+            (dl.ImageEnrichment, DoclingFeatures.STRUCTURE),
+            (dl.LinkEnrichment, DoclingFeatures.STRUCTURE),
+            (dl.LanguageEnrichment, DoclingFeatures.TEXT),
+            # Optionale Enrichments
+            (dl.EntityEnrichment, DoclingFeatures.ENTITIES),
+            (dl.SentimentEnrichment, DoclingFeatures.SENTIMENT),
+            (dl.SummaryEnrichment, DoclingFeatures.SUMMARY),
+        )
+        if not settings.enable_advanced_analysis:
+            features &= ~_ADVANCED_FEATURES
+
+        pipeline = dl.Pipeline()
+        for enrichment_cls, needed_for in enrichments:
+            if features & needed_for:
+                enrichment = self._enrichments.get(enrichment_cls)
+                if enrichment is None:
+                    enrichment = _SerializedEnrichment(enrichment_cls())
+                    self._enrichments[enrichment_cls] = enrichment
+                pipeline.add_enrichment(enrichment)
         return pipeline
 
     def _get_mime_type(self, file_path: Path) -> str:
         """Ermittelt den MIME-Type der Datei."""
-        extension = file_path.suffix.lower()
-        mime_types = {
-            '.pdf': 'application/pdf',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.doc': 'application/msword',
-            '.rtf': 'text/rtf',
-            '.odt': 'application/vnd.oasis.opendocument.text',
-            '.txt': 'text/plain',
-            '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            '.xls': 'application/vnd.ms-excel',
-            '.ods': 'application/vnd.oasis.opendocument.spreadsheet',
-            '.csv': 'text/csv',
-            '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-            '.ppt': 'application/vnd.ms-powerpoint',
-            '.odp': 'application/vnd.oasis.opendocument.presentation',
-            '.json': 'application/json',
-            '.xml': 'application/xml',
-            '.html': 'text/html',
-            '.htm': 'text/html',
-            '.yaml': 'text/yaml',
-            '.yml': 'text/yaml',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp',
-            '.tiff': 'image/tiff',
-            '.tif': 'image/tiff',
-            '.webp': 'image/webp',
-        }
-        return mime_types.get(extension, 'application/octet-stream')
-
-    def get_supported_formats(self) -> dict[str, Any]:
-        """Gibt Informationen über unterstützte Formate zurück."""
-        return {
-            'extensions': self.supported_extensions,
-            'mime_types': self.supported_mime_types,
-            'max_file_size': self.max_file_size,
-            'features': [
-                'text_extraction',
-                'metadata_extraction',
-                'structure_extraction',
-                'table_extraction',
-                'image_extraction',
-                'link_extraction',
-                'language_detection',
-                'entity_extraction',
-                'sentiment_analysis',
-                'summarization',
-            ],
-        }
+        return _MIME_BY_EXT.get(file_path.suffix.lower(), 'application/octet-stream')
+
+    def get_supported_formats(self) -> Mapping[str, Any]:
+        """
+        Gibt Informationen über unterstützte Formate zurück.
+
+        Wie in BaseExtractor einmal als unveränderliche Ansicht erstellt,
+        ergänzt um die von docling unterstützten Features.
+        """
+        if self._supported_formats is None:
+            self._supported_formats = MappingProxyType(
+                {
+                    'extensions': tuple(self.supported_extensions),
+                    'mime_types': tuple(self.supported_mime_types),
+                    'max_file_size': self.max_file_size,
+                    'features': (
+                        'text_extraction',
+                        'metadata_extraction',
+                        'structure_extraction',
+                        'table_extraction',
+                        'image_extraction',
+                        'link_extraction',
+                        'language_detection',
+                        'entity_extraction',
+                        'sentiment_analysis',
+                        'summarization',
+                    ),
+                },
+            )
+        return self._supported_formats
@@ -2,29 +2,287 @@
 Extraktor für DOCX-Dateien.
 """
 
+import importlib.util
+import os
+import posixpath
 import re
+import zipfile
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 try:
-    from docx import Document
-    from docx.oxml.table import CT_Tbl
-    from docx.oxml.text.paragraph import CT_P
-    from docx.table import Table
-    from docx.text.paragraph import Paragraph
+    from lxml import etree
 
-    DOCX_AVAILABLE = True
+    # Für alle Paketteile: keine Entitäten auflösen, nichts nachladen (XXE)
+    _XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+    # Fehler beim Lesen beschädigter oder unvollständiger DOCX-Pakete
+    _PACKAGE_ERRORS = (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError)
+
+    # python-docx wird nur für die Style-Namen gebraucht und erst dann importiert
+    DOCX_AVAILABLE = importlib.util.find_spec('docx') is not None
 except ImportError:
     DOCX_AVAILABLE = False
 
+from app.core.exceptions import InvalidFileException
 from app.extractors.base import BaseExtractor
 from app.models.schemas import ExtractedText, FileMetadata, StructuredData
 
+_WHITESPACE = re.compile(r'\s+')
+# Ebenen der Word-Überschriftenformate (maximal 6 Ebenen)
+_HEADING_LEVELS = {f'Heading {n}': min(n, 6) for n in range(1, 10)}
+# Nummerierte Listen, Aufzählungen und Buchstaben-Listen in einem Muster
+_LIST_ITEM = re.compile(r'(?:\d+\.|[•\-*]|[a-zA-Z]\.)\s')
+
+# WordprocessingML-Tags für das direkte Lesen von word/document.xml
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_BODY = f'{_W}body'
+_P = f'{_W}p'
+_TBL = f'{_W}tbl'
+_TR = f'{_W}tr'
+_TC = f'{_W}tc'
+_R = f'{_W}r'
+_T = f'{_W}t'
+_BR = f'{_W}br'
+_HYPERLINK = f'{_W}hyperlink'
+# Absatz-, Run- und Tabelleneigenschaften; find() mit einfachen Tags statt
+# Pfaden bleibt in C
+_PPR = f'{_W}pPr'
+_PSTYLE = f'{_W}pStyle'
+_RPR = f'{_W}rPr'
+_B = f'{_W}b'
+_SZ = f'{_W}sz'
+_TRPR = f'{_W}trPr'
+_TCPR = f'{_W}tcPr'
+_GRID_BEFORE = f'{_W}gridBefore'
+_GRID_SPAN = f'{_W}gridSpan'
+_VMERGE = f'{_W}vMerge'
+_VAL = f'{_W}val'
+_TYPE = f'{_W}type'
+_OFF_VALUES = frozenset({'0', 'false', 'off'})
+# Textentsprechung von Run-Elementen wie in python-docx (w:br separat)
+_RUN_CHARS = {
+    f'{_W}tab': '\t',
+    f'{_W}ptab': '\t',
+    f'{_W}cr': '\n',
+    f'{_W}noBreakHyphen': '-',
+}
+_REL_TYPES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_OFFICE_DOCUMENT_REL = f'{_REL_TYPES}/officeDocument'
+_EXTENDED_PROPERTIES_REL = f'{_REL_TYPES}/extended-properties'
+_CORE_PROPERTIES_REL = (
+    'http://schemas.openxmlformats.org/package/2006/relationships/metadata/'
+    'core-properties'
+)
+_PACKAGE_RELS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_DC = '{http://purl.org/dc/elements/1.1/}'
+_CP = '{http://schemas.openxmlformats.org/package/2006/metadata/core-properties}'
+_EP = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+
+
+def _package_targets(zf: zipfile.ZipFile) -> dict[str, str]:
+    """Ziele der Paket-Beziehungen aus _rels/.rels, nach Beziehungstyp."""
+    try:
+        rels = etree.fromstring(zf.read('_rels/.rels'), _XML_PARSER)
+    except KeyError:
+        return {}
+    targets: dict[str, str] = {}
+    for rel in rels.iterchildren(f'{_PACKAGE_RELS}Relationship'):
+        targets.setdefault(rel.get('Type', ''), rel.get('Target', '').lstrip('/'))
+    return targets
+
+
+def _main_part_name(zf: zipfile.ZipFile) -> str:
+    """Ermittelt den Pfad des Hauptdokuments im DOCX-Paket."""
+    return _package_targets(zf).get(_OFFICE_DOCUMENT_REL, 'word/document.xml')
+
+
+def _read_part(zf: zipfile.ZipFile, name: str) -> Any:
+    """Parst einen XML-Teil des Pakets; None, wenn er fehlt."""
+    try:
+        return etree.fromstring(zf.read(name), _XML_PARSER)
+    except KeyError:
+        return None
+
+
+def _count_page_breaks(zf: zipfile.ZipFile, main_part: str) -> int:
+    """Zählt harte Seitenumbrüche (w:br mit type="page") im Hauptdokument."""
+    count = 0
+    with zf.open(main_part) as stream:
+        for _, elem in etree.iterparse(
+            stream,
+            events=('end',),
+            tag=_BR,
+            resolve_entities=False,
+            no_network=True,
+        ):
+            if elem.get(_TYPE) == 'page':
+                count += 1
+            elem.clear()
+    return count
+
+
+def _paragraph_style_names(zf: zipfile.ZipFile, main_part: str) -> dict[str, str]:
+    """
+    Liest die Namen der Absatzformate aus styles.xml.
+
+    Der Schlüssel '' enthält den Namen des Standard-Absatzformats.
+    """
+    from docx.styles import BabelFish
+
+    names: dict[str, str] = {}
+    try:
+        styles = etree.fromstring(
+            zf.read(posixpath.join(posixpath.dirname(main_part), 'styles.xml')),
+            _XML_PARSER,
+        )
+    except KeyError:
+        return names
+
+    default = ''
+    for style in styles.iterchildren(f'{_W}style'):
+        if style.get(_TYPE, 'paragraph') != 'paragraph':
+            continue
+        name_elem = style.find(f'{_W}name')
+        name = name_elem.get(_VAL) if name_elem is not None else None
+        name = BabelFish.internal2ui(name) if name else ''
+        # Bei doppelten IDs gilt wie in python-docx der erste Eintrag
+        names.setdefault(style.get(f'{_W}styleId', ''), name)
+        if style.get(f'{_W}default', '0') not in _OFF_VALUES:
+            default = name
+    names[''] = default
+    return names
+
+
+def _iter_body(file_path: Path) -> Iterator[tuple[Any, dict[str, str]]]:
+    """
+    Liefert Absätze und Tabellen direkt unter w:body als lxml-Elemente.
+
+    Das Dokument wird per iterparse gestreamt; bereits gelieferte Elemente
+    werden danach verworfen, damit der Speicherbedarf begrenzt bleibt.
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        main_part = _main_part_name(zf)
+        style_names = _paragraph_style_names(zf, main_part)
+        with zf.open(main_part) as stream:
+            for _, elem in etree.iterparse(
+                stream,
+                events=('end',),
+                tag=(_P, _TBL),
+                resolve_entities=False,
+                no_network=True,
+            ):
+                parent = elem.getparent()
+                if parent is None or parent.tag != _BODY:
+                    continue
+                yield elem, style_names
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def _run_text(run: Any, parts: list[str]) -> None:
+    """Hängt den Text eines w:r-Elements an parts an."""
+    for child in run:
+        tag = child.tag
+        if tag == _T:
+            parts.append(child.text or '')
+        elif tag == _BR:
+            # Nur Zeilenumbrüche ergeben Text, Seiten-/Spaltenumbrüche nicht
+            if child.get(_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_CHARS:
+            parts.append(_RUN_CHARS[tag])
+
+
+def _paragraph_text(paragraph: Any) -> str:
+    """Text eines w:p-Elements (Runs und Hyperlinks) wie Paragraph.text."""
+    parts: list[str] = []
+    for child in paragraph:
+        if child.tag == _R:
+            _run_text(child, parts)
+        elif child.tag == _HYPERLINK:
+            for run in child.iterchildren(_R):
+                _run_text(run, parts)
+    return ''.join(parts)
+
+
+def _paragraph_style(paragraph: Any, style_names: dict[str, str]) -> str:
+    """Name des Absatzformats; ohne bzw. mit unbekannter ID das Standardformat."""
+    ppr = paragraph.find(_PPR)
+    style = ppr.find(_PSTYLE) if ppr is not None else None
+    style_id = style.get(_VAL) if style is not None else None
+    return style_names.get(style_id, style_names.get('', ''))
+
+
+def _run_formats(paragraph: Any) -> list[tuple[bool, float | None]]:
+    """Direkte Formatierung (fett, Schriftgröße in pt) der Runs eines Absatzes."""
+    formats = []
+    for run in paragraph.iterchildren(_R):
+        bold = False
+        size = None
+        rpr = run.find(_RPR)
+        if rpr is not None:
+            b = rpr.find(_B)
+            bold = b is not None and b.get(_VAL, 'true') not in _OFF_VALUES
+            sz = rpr.find(_SZ)
+            if sz is not None:
+                try:
+                    # Angabe in halben Punkten
+                    size = int(sz.get(_VAL, '')) / 2
+                except ValueError:
+                    size = None
+        formats.append((bold, size))
+    return formats
+
+
+def _table_rows(table: Any) -> list[list[str]]:
+    """
+    Zelltexte einer Tabelle je Zeile wie python-docx' Row.cells.
+
+    Horizontal verbundene Zellen werden je Rasterspalte wiederholt, vertikal
+    verbundene Zellen liefern den Text der Ursprungszelle.
+    """
+    rows = []
+    above: dict[int, str] = {}
+    for tr in table.iterchildren(_TR):
+        grid = 0
+        tr_pr = tr.find(_TRPR)
+        if tr_pr is not None:
+            grid_before = tr_pr.find(_GRID_BEFORE)
+            if grid_before is not None:
+                grid = int(grid_before.get(_VAL, 0))
+        row: list[str] = []
+        current: dict[int, str] = {}
+        for tc in tr.iterchildren(_TC):
+            span = 1
+            vmerge = None
+            tc_pr = tc.find(_TCPR)
+            if tc_pr is not None:
+                span_elem = tc_pr.find(_GRID_SPAN)
+                if span_elem is not None:
+                    span = int(span_elem.get(_VAL, 1))
+                vmerge = tc_pr.find(_VMERGE)
+            if vmerge is not None and vmerge.get(_VAL, 'continue') == 'continue':
+                text = above.get(grid, '')
+            else:
+                text = '\n'.join([_paragraph_text(p) for p in tc.iterchildren(_P)])
+            for offset in range(grid, grid + span):
+                current[offset] = text
+            row.extend([text] * span)
+            grid += span
+        rows.append(row)
+        above = current
+    return rows
+
 
 class DOCXExtractor(BaseExtractor):
     """Extraktor für DOCX-Dateien."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         if not DOCX_AVAILABLE:
@@ -41,14 +299,16 @@ class DOCXExtractor(BaseExtractor):
 
     def can_extract(self, file_path: Path, mime_type: str) -> bool:
         """Prüft, ob der Extraktor die DOCX-Datei verarbeiten kann."""
-        return (
-            file_path.suffix.lower() in self.supported_extensions
-            or mime_type in self.supported_mime_types
-        )
-
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
+        return self._matches_format(file_path, mime_type)
+
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """Extrahiert Metadaten aus der DOCX-Datei."""
-        stat = file_path.stat()
+        stat = file_path.stat() if st is None else st
 
         metadata = FileMetadata(
             filename=file_path.name,
@@ -60,52 +320,77 @@ class DOCXExtractor(BaseExtractor):
         )
 
         try:
-            doc = Document(file_path)
-            core_props = doc.core_properties
-
-            if core_props.title:
-                metadata.title = core_props.title
-            if core_props.author:
-                metadata.author = core_props.author
-            if core_props.subject:
-                metadata.subject = core_props.subject
-            if core_props.keywords:
-                metadata.keywords = [k.strip() for k in core_props.keywords.split(',')]
-
-            # Seitenanzahl schätzen (ungefähr)
-            paragraph_count = len(doc.paragraphs)
-            metadata.page_count = max(1, paragraph_count // 20)  # Grobe Schätzung
-
-        except (ValueError, AttributeError):
+            with zipfile.ZipFile(file_path) as zf:
+                targets = _package_targets(zf)
+
+                # Dokumenteigenschaften direkt aus docProps/core.xml lesen
+                core = _read_part(
+                    zf,
+                    targets.get(_CORE_PROPERTIES_REL, 'docProps/core.xml'),
+                )
+                if core is not None:
+                    title = core.findtext(f'{_DC}title')
+                    author = core.findtext(f'{_DC}creator')
+                    subject = core.findtext(f'{_DC}subject')
+                    keywords = core.findtext(f'{_CP}keywords')
+                    if title:
+                        metadata.title = title
+                    if author:
+                        metadata.author = author
+                    if subject:
+                        metadata.subject = subject
+                    if keywords:
+                        metadata.keywords = [k.strip() for k in keywords.split(',')]
+
+                # Seitenanzahl: harte Seitenumbrüche ergeben eine Untergrenze,
+                # docProps/app.xml (von Word gepflegt) kann sie erhöhen
+                main_part = targets.get(_OFFICE_DOCUMENT_REL, 'word/document.xml')
+                page_count = 1 + _count_page_breaks(zf, main_part)
+                app = _read_part(
+                    zf,
+                    targets.get(_EXTENDED_PROPERTIES_REL, 'docProps/app.xml'),
+                )
+                pages = app.findtext(f'{_EP}Pages') if app is not None else None
+                if pages and pages.strip().isdigit():
+                    page_count = max(page_count, int(pages))
+                metadata.page_count = page_count
+
+        except (ValueError, AttributeError, *_PACKAGE_ERRORS):
+            # Fallback zu Basis-Metadaten
             pass
 
         return metadata
 
     def extract_text(self, file_path: Path) -> ExtractedText:
         """Extrahiert Text aus der DOCX-Datei."""
-        content = ''
+        # Teilstücke sammeln und einmal verbinden statt wiederholter Konkatenation;
+        # Tabellentext folgt wie bisher nach dem Text aller Absätze
+        parts: list[str] = []
+        table_parts: list[str] = []
 
         try:
-            doc = Document(file_path)
-
-            # Text aus allen Absätzen extrahieren
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    content += paragraph.text + '\n'
-
-            # Text aus Tabellen extrahieren
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            content += cell.text + '\t'
-                    content += '\n'
-
-        except Exception as err:
-            raise RuntimeError('DOCX-Extraktion fehlgeschlagen') from err
+            for element, _ in _iter_body(file_path):
+                if element.tag == _P:
+                    text = _paragraph_text(element)
+                    if text.strip():
+                        parts.append(text)
+                        parts.append('\n')
+                else:
+                    for row in _table_rows(element):
+                        for cell_text in row:
+                            if cell_text.strip():
+                                table_parts.append(cell_text)
+                                table_parts.append('\t')
+                        table_parts.append('\n')
+
+        except _PACKAGE_ERRORS as err:
+            raise InvalidFileException(
+                file_path.name,
+                'Kein gültiges DOCX-Paket',
+            ) from err
 
         # Text bereinigen
-        content = self._clean_text(content)
+        content = self._clean_text(''.join(parts) + ''.join(table_parts))
 
         # Statistiken berechnen
         word_count = len(content.split()) if content else 0
@@ -124,21 +409,23 @@ class DOCXExtractor(BaseExtractor):
         lists = []
 
         try:
-            doc = Document(file_path)
-
-            # Dokument durchgehen und Struktur analysieren
-            for element in doc.element.body:
-                if isinstance(element, CT_P):
+            # Dokument als XML-Strom durchgehen und Struktur analysieren
+            for element, style_names in _iter_body(file_path):
+                if element.tag == _P:
                     # Absatz
-                    paragraph = Paragraph(element, doc)
-                    text = paragraph.text.strip()
+                    text = _paragraph_text(element).strip()
 
                     if text:
                         # Überschriften erkennen
-                        if self._is_heading(paragraph):
+                        is_heading, level = self._classify_heading(
+                            text,
+                            _paragraph_style(element, style_names),
+                            _run_formats(element),
+                        )
+                        if is_heading:
                             headings.append(
                                 {
-                                    'level': self._get_heading_level(paragraph),
+                                    'level': level,
                                     'text': text,
                                     'position': len(headings),
                                 },
@@ -148,13 +435,17 @@ class DOCXExtractor(BaseExtractor):
                         if self._is_list_item(text):
                             lists.append(text)
 
-                elif isinstance(element, CT_Tbl):
+                else:
                     # Tabelle
-                    table = Table(element, doc)
-                    table_data = self._extract_table_data(table)
+                    table_data = self._extract_table_data(element)
                     if table_data:
                         tables.append(table_data)
 
+        except _PACKAGE_ERRORS as err:
+            raise InvalidFileException(
+                file_path.name,
+                'Kein gültiges DOCX-Paket',
+            ) from err
         except (ValueError, AttributeError, TypeError):
             pass
 
@@ -167,81 +458,66 @@ class DOCXExtractor(BaseExtractor):
     def _clean_text(self, text: str) -> str:
         """Bereinigt den extrahierten Text."""
         # Überflüssige Whitespaces entfernen
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE.sub(' ', text)
         # Zeilenumbrüche normalisieren
         text = text.replace('\r\n', '\n').replace('\r', '\n')
         # Tabulatoren durch Leerzeichen ersetzen
         text = text.replace('\t', ' ')
         return text.strip()
 
-    def _is_heading(self, paragraph: Paragraph) -> bool:
-        """Prüft, ob ein Absatz eine Überschrift ist."""
-        # Prüfe auf Überschriften-Styles
-        if paragraph.style.name.startswith('Heading'):
-            return True
-
-        # Prüfe auf Formatierung (fett, größere Schrift)
-        for run in paragraph.runs:
-            if run.bold or (run.font.size and run.font.size.pt > 12):
-                return True
-
-        # Prüfe auf kurze Zeilen ohne Punkt am Ende
-        text = paragraph.text.strip()
-        if len(text) < 100 and text and text[-1] not in '.,!?':
-            return True
-
-        return False
-
-    def _get_heading_level(self, paragraph: Paragraph) -> int:
-        """Ermittelt die Hierarchie-Ebene einer Überschrift."""
-        style_name = paragraph.style.name
-
-        # Aus Style-Namen extrahieren
-        if 'Heading' in style_name:
+    def _classify_heading(
+        self,
+        text: str,
+        style_name: str,
+        runs: list[tuple[bool, float | None]],
+    ) -> tuple[bool, int]:
+        """
+        Prüft, ob ein Absatz eine Überschrift ist, und ermittelt ihre Ebene.
+
+        Returns:
+            Tupel aus Überschriften-Flag und Hierarchie-Ebene
+        """
+        # Überschriften-Styles
+        is_heading = style_name.startswith('Heading')
+        level = _HEADING_LEVELS.get(style_name)
+        if level is None and 'Heading' in style_name:
             try:
-                level = int(style_name.replace('Heading ', ''))
-                return min(level, 6)  # Maximal 6 Ebenen
+                level = min(int(style_name.replace('Heading ', '')), 6)
             except ValueError:
                 pass
 
-        # Fallback: Basierend auf Formatierung
-        for run in paragraph.runs:
-            if run.font.size and run.font.size.pt > 16:
-                return 1
-            if run.font.size and run.font.size.pt > 14:
-                return 2
-            if run.bold:
-                return 3
-
-        return 1
+        # Formatierung (fett, größere Schrift); die Ebene bestimmt der erste
+        # Run mit passender Formatierung
+        format_level = None
+        for bold, size in runs:
+            if bold or (size and size > 12):
+                is_heading = True
+            if format_level is None:
+                if size and size > 16:
+                    format_level = 1
+                elif size and size > 14:
+                    format_level = 2
+                elif bold:
+                    format_level = 3
+
+        # Kurze Zeilen ohne Punkt am Ende
+        if not is_heading and len(text) < 100 and text and text[-1] not in '.,!?':
+            is_heading = True
+
+        return is_heading, level or format_level or 1
 
     def _is_list_item(self, text: str) -> bool:
         """Prüft, ob ein Text ein Listenelement ist."""
-        # Nummerierte Listen
-        if re.match(r'^\d+\.\s', text):
-            return True
-
-        # Aufzählungslisten
-        if re.match(r'^[•\-*]\s', text):
-            return True
-
-        # Buchstaben-Listen
-        if re.match(r'^[a-zA-Z]\.\s', text):
-            return True
-
-        return False
+        return _LIST_ITEM.match(text) is not None
 
-    def _extract_table_data(self, table: Table) -> dict[str, Any]:
-        """Extrahiert Daten aus einer Tabelle."""
+    def _extract_table_data(self, table: Any) -> dict[str, Any]:
+        """Extrahiert Daten aus einem w:tbl-Element."""
         try:
             rows = []
             headers = []
 
-            for i, row in enumerate(table.rows):
-                row_data = []
-                for cell in row.cells:
-                    cell_text = cell.text.strip()
-                    row_data.append(cell_text)
+            for i, cells in enumerate(_table_rows(table)):
+                row_data = [cell_text.strip() for cell_text in cells]
 
                 if i == 0:
                     # Erste Zeile als Header behandeln
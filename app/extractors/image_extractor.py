@@ -2,8 +2,13 @@
 Extraktor für Bilddateien mit OCR-Funktionalität.
 """
 
+import os
+import threading
+from collections.abc import Mapping
 from datetime import UTC, datetime
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, ClassVar
 
 from PIL import Image
 
@@ -20,10 +25,71 @@ from app.models.schemas import (
 # inside methods to reduce baseline memory usage
 OCR_AVAILABLE = True
 
+# Bilder gelten für die OCR als binarisiert, wenn dieser Anteil der Pixel
+# in den dunkelsten bzw. hellsten _BINARY_MARGIN Graustufen liegt
+_BINARY_MARGIN = 32
+_BINARY_SHARE = 0.98
+
+# k-Means-Schritte zur Verfeinerung der Farbpalette
+_PALETTE_ITERATIONS = 3
+
+# EXIF-Tags für Metadaten (spätere Einträge überschreiben frühere)
+_EXIF_FIELDS: tuple[tuple[int, str], ...] = (
+    (270, 'title'),  # ImageDescription
+    (315, 'author'),  # Artist
+    (33432, 'author'),  # Copyright
+)
+
+# MIME-Types nach Dateiendung
+_MIME_BY_EXT: Mapping[str, str] = MappingProxyType(
+    {
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.png': 'image/png',
+        '.gif': 'image/gif',
+        '.bmp': 'image/bmp',
+        '.tiff': 'image/tiff',
+        '.tif': 'image/tiff',
+        '.webp': 'image/webp',
+        '.svg': 'image/svg+xml',
+    },
+)
+
+
+def _join_ocr_results(results: list[Any]) -> tuple[str, float] | None:
+    """Fasst EasyOCR-Treffer zu Text und mittlerer Konfidenz zusammen."""
+    if not results:
+        return None
+    text = ' '.join(text for _bbox, text, _confidence in results)
+    return text, sum(confidence for *_, confidence in results) / len(results)
+
+
+def _cluster_means(pixels: Any, labels: Any) -> tuple[Any, Any]:
+    """Mittlere Farbe und Pixelanzahl je (nicht leerem) Cluster."""
+    import numpy as np  # Lazy import
+
+    counts = np.bincount(labels)
+    used = np.flatnonzero(counts)
+    sums = np.stack(
+        [np.bincount(labels, weights=pixels[:, channel]) for channel in range(3)],
+        axis=1,
+    )
+    return sums[used] / counts[used, None], counts[used]
+
 
 class ImageExtractor(BaseExtractor):
     """Extraktor für Bilddateien mit OCR."""
 
+    __slots__ = ()
+
+    # EasyOCR-Reader je Sprachkombination; das Laden der Modelle dauert
+    # Sekunden und passiert daher nur einmal pro Prozess
+    _reader_cache: ClassVar[dict[tuple[str, ...], Any]] = {}
+    _reader_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    # CLAHE-Objekte halten interne Puffer und werden daher je Thread angelegt
+    _clahe_local: ClassVar[threading.local] = threading.local()
+
     def __init__(self):
         super().__init__()
         if not OCR_AVAILABLE:
@@ -53,14 +119,16 @@ class ImageExtractor(BaseExtractor):
 
     def can_extract(self, file_path: Path, mime_type: str) -> bool:
         """Prüft, ob der Extraktor die Bilddatei verarbeiten kann."""
-        return (
-            file_path.suffix.lower() in self.supported_extensions
-            or mime_type in self.supported_mime_types
-        )
+        return self._matches_format(file_path, mime_type)
 
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """Extrahiert Metadaten aus der Bilddatei."""
-        stat = file_path.stat()
+        stat = file_path.stat() if st is None else st
 
         metadata = FileMetadata(
             filename=file_path.name,
@@ -88,21 +156,11 @@ class ImageExtractor(BaseExtractor):
                 metadata.color_space = img.mode
 
                 # EXIF-Daten (falls verfügbar)
-                if hasattr(img, 'getexif'):
-                    exif = img.getexif()
-                    if exif:
-                        # EXIF-Tags für Metadaten
-                        exif_tags = {
-                            270: 'title',  # ImageDescription
-                            315: 'author',  # Artist
-                            33432: 'author',  # Copyright
-                        }
-
-                        for tag_id, field_name in exif_tags.items():
-                            if tag_id in exif:
-                                value = exif[tag_id]
-                                if hasattr(metadata, field_name):
-                                    setattr(metadata, field_name, str(value))
+                exif = img.getexif()
+                for tag_id, field_name in _EXIF_FIELDS:
+                    value = exif.get(tag_id)
+                    if value is not None:
+                        setattr(metadata, field_name, str(value))
 
         except (OSError, ValueError, AttributeError):
             pass
@@ -125,30 +183,12 @@ class ImageExtractor(BaseExtractor):
         try:
             # Bild laden
             with Image.open(file_path) as img:
-                # Bild für OCR vorbereiten
-                img_array = self._prepare_image_for_ocr(img)
-
                 # OCR mit EasyOCR (bessere Ergebnisse)
                 try:
-                    # Lazy import to avoid loading torch unless needed
-                    import easyocr  # type: ignore
-
-                    reader = easyocr.Reader(['de', 'en'])
-                    results = reader.readtext(img_array)
-
-                    if results:
+                    ocr_result = self._run_ocr(file_path, img)
+                    if ocr_result:
                         ocr_used = True
-                        text_parts = []
-                        total_confidence = 0.0
-
-                        for _bbox, text, confidence in results:
-                            text_parts.append(text)
-                            total_confidence += confidence
-
-                        content = ' '.join(text_parts)
-                        ocr_confidence = (
-                            total_confidence / len(results) if results else 0.0
-                        )
+                        content, ocr_confidence = ocr_result
 
                 except Exception:
                     # Fallback zu Tesseract
@@ -176,6 +216,65 @@ class ImageExtractor(BaseExtractor):
             ocr_confidence=ocr_confidence,
         )
 
+    def extract_text_batch(
+        self,
+        file_paths: list[Path],
+        batch_size: int = 8,
+        n_width: int = 800,
+        n_height: int = 600,
+    ) -> list[ExtractedText]:
+        """
+        Extrahiert Text aus mehreren Bilddateien mit gebündelter OCR.
+
+        Die Bilder werden einzeln vorbereitet und von EasyOCR auf eine gemeinsame
+        Größe skaliert, sodass Erkennung und Texterkennung stapelweise laufen.
+
+        Args:
+            file_paths: Pfade der Bilddateien
+            batch_size: Anzahl Bilder pro OCR-Durchlauf
+            n_width: Gemeinsame Breite der Bilder im Stapel
+            n_height: Gemeinsame Höhe der Bilder im Stapel
+
+        Returns:
+            ExtractedText je Datei in der Reihenfolge von file_paths
+        """
+        ocr_results: list[tuple[str, float] | None] = [None] * len(file_paths)
+
+        if settings.extract_image_text and OCR_AVAILABLE:
+            # Bilder einzeln vorbereiten; nicht lesbare Dateien bleiben ohne Text
+            prepared = []
+            for index, file_path in enumerate(file_paths):
+                try:
+                    with Image.open(file_path) as img:
+                        prepared.append((index, self._prepare_image_for_ocr(img)))
+                except (OSError, ValueError):
+                    pass
+
+            reader = self._get_reader() if prepared else None
+            for start in range(0, len(prepared), batch_size):
+                batch = prepared[start : start + batch_size]
+                batch_results = reader.readtext_batched(
+                    [img_array for _, img_array in batch],
+                    n_width=n_width,
+                    n_height=n_height,
+                )
+                for (index, _), results in zip(batch, batch_results, strict=True):
+                    ocr_results[index] = _join_ocr_results(results)
+
+        extracted = []
+        for ocr_result in ocr_results:
+            content, ocr_confidence = ocr_result or ('', 0.0)
+            extracted.append(
+                ExtractedText(
+                    content=content,
+                    word_count=len(content.split()) if content else 0,
+                    character_count=len(content),
+                    ocr_used=ocr_result is not None,
+                    ocr_confidence=ocr_confidence,
+                ),
+            )
+        return extracted
+
     def extract_structured_data(self, file_path: Path) -> StructuredData:
         """Extrahiert strukturierte Daten aus der Bilddatei."""
         images = []
@@ -193,42 +292,92 @@ class ImageExtractor(BaseExtractor):
 
     def _get_mime_type(self, file_path: Path) -> str:
         """Ermittelt den MIME-Type der Bilddatei."""
-        extension = file_path.suffix.lower()
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp',
-            '.tiff': 'image/tiff',
-            '.tif': 'image/tiff',
-            '.webp': 'image/webp',
-            '.svg': 'image/svg+xml',
-        }
-        return mime_types.get(extension, 'image/jpeg')
+        return _MIME_BY_EXT.get(file_path.suffix.lower(), 'image/jpeg')
+
+    @classmethod
+    def _get_reader(cls, langs: tuple[str, ...] = ('de', 'en')) -> Any:
+        """Gibt den (einmal pro Prozess geladenen) EasyOCR-Reader zurück."""
+        reader = cls._reader_cache.get(langs)
+        if reader is None:
+            with cls._reader_lock:
+                reader = cls._reader_cache.get(langs)
+                if reader is None:
+                    # Lazy import to avoid loading torch unless needed
+                    import easyocr  # type: ignore
 
-    def _prepare_image_for_ocr(self, img: Image.Image):
-        """Bereitet ein Bild für OCR vor."""
-        # Zu RGB konvertieren
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+                    reader = cls._reader_cache[langs] = easyocr.Reader(list(langs))
+        return reader
 
-        # Zu NumPy-Array konvertieren
-        import numpy as np  # Lazy import
+    def _run_ocr(
+        self,
+        file_path: Path,
+        img: Image.Image,
+    ) -> tuple[str, float] | None:
+        """
+        Führt EasyOCR für ein Bild einmal pro Extraktion aus.
+
+        extract_text() und extract_structured_data() laufen parallel und
+        teilen sich einen Lauf, siehe BaseExtractor._shared().
+
+        Returns:
+            Erkannter Text und mittlere Konfidenz, None ohne Treffer
+        """
+        return self._shared(
+            ('ocr', file_path),
+            lambda: _join_ocr_results(
+                self._get_reader().readtext(self._prepare_image_for_ocr(img)),
+            ),
+        )
 
-        img_array = np.array(img)
+    def _prepare_image_for_ocr(self, img: Image.Image):
+        """Bereitet ein Bild für OCR vor."""
+        # Große Bilder verkleinern; EasyOCR skaliert ohnehin auf seine
+        # Canvas-Größe, die Vorverarbeitung läuft so auf weniger Pixeln
+        max_side = settings.ocr_max_side
+        if max(img.size) > max_side:
+            scale = max_side / max(img.size)
+            img = img.resize(
+                (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                Image.Resampling.LANCZOS,
+                reducing_gap=3.0,
+            )
 
-        # Graustufen konvertieren
+        # Zu NumPy-Array konvertieren; asarray übernimmt den Pillow-Puffer ohne
+        # weitere Kopie (das Array wird nur gelesen)
         import cv2  # Lazy import
+        import numpy as np  # Lazy import
 
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-
-        # Rauschunterdrückung
-        denoised = cv2.medianBlur(gray, 3)
+        if img.mode == '1':
+            img = img.convert('L')
+        if img.mode == 'L':
+            # Bereits Graustufen, der Umweg über RGB entfällt
+            gray = np.asarray(img)
+        else:
+            # Zu RGB und dann in Graustufen konvertieren
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            gray = cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2GRAY)
+
+        # Bereits binarisierte Scans (fast nur sehr dunkle und sehr helle Pixel)
+        # brauchen keine Vorverarbeitung; der Median-Filter würde dort feine
+        # Striche verwischen, CLAHE ändert am Kontrast nichts mehr
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+        extremes = hist[:_BINARY_MARGIN].sum() + hist[-_BINARY_MARGIN:].sum()
+        if extremes >= _BINARY_SHARE * gray.size:
+            return gray
+
+        # Rauschunterdrückung (optional, zusätzlicher Durchlauf über das Bild)
+        if settings.ocr_denoise:
+            gray = cv2.medianBlur(gray, 3)
 
         # Kontrastverbesserung
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        return clahe.apply(denoised)
+        clahe = getattr(self._clahe_local, 'clahe', None)
+        if clahe is None:
+            clahe = self._clahe_local.clahe = cv2.createCLAHE(
+                clipLimit=2.0,
+                tileGridSize=(8, 8),
+            )
+        return clahe.apply(gray)
 
     def _extract_image_info(self, img: Image.Image, file_path: Path) -> ExtractedImage:
         """Extrahiert detaillierte Bild-Informationen."""
@@ -246,22 +395,9 @@ class ImageExtractor(BaseExtractor):
         # OCR-Text extrahieren
         if settings.extract_image_text and OCR_AVAILABLE:
             try:
-                img_array = self._prepare_image_for_ocr(img)
-                import easyocr  # type: ignore
-
-                reader = easyocr.Reader(['de', 'en'])
-                results = reader.readtext(img_array)
-
-                if results:
-                    text_parts = []
-                    total_confidence = 0.0
-
-                    for _bbox, text, confidence in results:
-                        text_parts.append(text)
-                        total_confidence += confidence
-
-                    image_info.extracted_text = ' '.join(text_parts)
-                    image_info.ocr_confidence = total_confidence / len(results)
+                ocr_result = self._run_ocr(file_path, img)
+                if ocr_result:
+                    image_info.extracted_text, image_info.ocr_confidence = ocr_result
 
             except Exception:
                 pass
@@ -281,22 +417,36 @@ class ImageExtractor(BaseExtractor):
     ) -> list[str]:
         """Extrahiert die dominanten Farben aus einem Bild."""
         try:
-            # Bild auf kleinere Größe reduzieren für schnellere Verarbeitung
-            img_small = img.resize((150, 150))
-
-            # Farben quantisieren
-            img_quantized = img_small.quantize(colors=num_colors)
-
-            # Dominante Farben extrahieren
-            colors = []
-            for color in img_quantized.getcolors():
-                if color:
-                    # RGB-Werte in Hex-Format konvertieren
-                    rgb = img_quantized.getpalette()[color[1] * 3 : color[1] * 3 + 3]
-                    hex_color = f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
-                    colors.append(hex_color)
-
-            return colors[:num_colors]
+            # Bild auf kleinere Größe reduzieren für schnellere Verarbeitung;
+            # reducing_gap verkleinert große Bilder zuerst ganzzahlig
+            img_small = img.resize((150, 150), reducing_gap=2.0)
+            if img_small.mode != 'RGB':
+                img_small = img_small.convert('RGB')
+
+            # Farben quantisieren; die Octree-Palette dient nur als Startwert
+            # und wird mit einigen k-Means-Schritten auf die tatsächlichen
+            # Farbschwerpunkte nachgezogen (Median-Cut ist ~50x langsamer)
+            img_quantized = img_small.quantize(
+                colors=num_colors,
+                method=Image.Quantize.FASTOCTREE,
+            )
+
+            import numpy as np  # Lazy import
+
+            pixels = np.asarray(img_small, dtype=np.float32).reshape(-1, 3)
+            labels = np.asarray(img_quantized, dtype=np.intp).reshape(-1)
+            centers, counts = _cluster_means(pixels, labels)
+            for _ in range(_PALETTE_ITERATIONS):
+                # Nächster Schwerpunkt über |c|² - 2·p·c (|p|² ist je Pixel
+                # konstant); die Matrixmultiplikation läuft über BLAS
+                centers = centers.astype(np.float32)
+                scores = (centers * centers).sum(axis=1) - 2 * (pixels @ centers.T)
+                centers, counts = _cluster_means(pixels, scores.argmin(axis=1))
+
+            # Dominante Farben extrahieren (häufigste zuerst) und in Hex umwandeln
+            order = np.argsort(-counts, kind='stable')[:num_colors]
+            rgb = np.rint(centers[order]).astype(np.uint8).tolist()
+            return [f'#{r:02x}{g:02x}{b:02x}' for r, g, b in rgb]
 
         except (ValueError, AttributeError):
             return []
@@ -2,9 +2,21 @@
 Extraktor für Medien-Dateien (Video/Audio) mit Transkription.
 """
 
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
 import tempfile
+import threading
+import wave
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, ClassVar
 
 from app.core.config import settings
 from app.extractors.base import BaseExtractor
@@ -18,10 +30,76 @@ from app.models.schemas import (
 MEDIA_AVAILABLE = True
 # Defer heavy media imports to runtime to reduce idle memory usage
 
+# Lokale Transkription mit faster-whisper (CTranslate2); ohne das Paket wird
+# auf die Google-Spracherkennung zurückgegriffen
+WHISPER_AVAILABLE = importlib.util.find_spec('faster_whisper') is not None
+
+# MIME-Types nach Dateiendung
+_MIME_BY_EXT: Mapping[str, str] = MappingProxyType(
+    {
+        # Video
+        '.mp4': 'video/mp4',
+        '.avi': 'video/avi',
+        '.mov': 'video/quicktime',
+        '.wmv': 'video/x-ms-wmv',
+        '.flv': 'video/x-flv',
+        '.webm': 'video/webm',
+        '.mkv': 'video/x-matroska',
+        # Audio
+        '.mp3': 'audio/mpeg',
+        '.wav': 'audio/wav',
+        '.flac': 'audio/flac',
+        '.aac': 'audio/aac',
+        '.ogg': 'audio/ogg',
+    },
+)
+_VIDEO_EXTENSIONS = frozenset(
+    {'.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv', '.m4v'},
+)
+_AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma'})
+
+# ffprobe liest nur Container- und Stream-Header, ffmpeg extrahiert die Tonspur
+# ohne Videoframes; MoviePy/pydub dekodieren alles und dienen nur als Fallback
+FFPROBE_PATH = shutil.which('ffprobe')
+FFMPEG_PATH = shutil.which('ffmpeg')
+_FFPROBE_TIMEOUT = 30
+# Abtastrate der an die Spracherkennung übergebenen WAV-Daten
+_WAV_RATE = 16000
+# Gleichzeitige Anfragen an die Spracherkennung je Datei
+_TRANSCRIBE_WORKERS = 4
+
+
+def _frame_rate(value: str | None) -> float | None:
+    """Wandelt eine ffprobe-Bildrate wie '30000/1001' in eine Zahl um."""
+    if not value:
+        return None
+    num, _, den = value.partition('/')
+    if not den:
+        return float(num)
+    return float(num) / float(den) if float(den) else None
+
+
+def _recognize_chunk(chunk: Any) -> str:
+    """Erkennt einen Audio-Abschnitt; Abschnitte ohne Sprache ergeben ''."""
+    import speech_recognition as sr  # type: ignore
+
+    audio_data = sr.AudioData(chunk.raw_data, chunk.frame_rate, chunk.sample_width)
+    try:
+        return sr.Recognizer().recognize_google(audio_data, language='de-DE')
+    except sr.UnknownValueError:
+        return ''
+
 
 class MediaExtractor(BaseExtractor):
     """Extraktor für Medien-Dateien (Video/Audio)."""
 
+    __slots__ = ()
+
+    # Whisper-Modell; das Laden dauert Sekunden und passiert daher nur einmal
+    # pro Prozess
+    _whisper_model: ClassVar[Any] = None
+    _whisper_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(self):
         super().__init__()
         if not MEDIA_AVAILABLE:
@@ -66,14 +144,16 @@ class MediaExtractor(BaseExtractor):
 
     def can_extract(self, file_path: Path, mime_type: str) -> bool:
         """Prüft, ob der Extraktor die Mediendatei verarbeiten kann."""
-        return (
-            file_path.suffix.lower() in self.supported_extensions
-            or mime_type in self.supported_mime_types
-        )
-
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
+        return self._matches_format(file_path, mime_type)
+
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """Extrahiert Metadaten aus der Mediendatei."""
-        stat = file_path.stat()
+        stat = file_path.stat() if st is None else st
 
         metadata = FileMetadata(
             filename=file_path.name,
@@ -87,28 +167,22 @@ class MediaExtractor(BaseExtractor):
         try:
             if self._is_video_file(file_path):
                 # Video-Metadaten
-                from moviepy.editor import VideoFileClip  # type: ignore
-
-                clip = VideoFileClip(str(file_path))
-                metadata.duration = clip.duration
+                info = self._video_info(file_path)
+                metadata.duration = info['duration']
                 metadata.dimensions = {
-                    'width': int(clip.w),
-                    'height': int(clip.h),
+                    'width': info['width'],
+                    'height': info['height'],
                 }
-                metadata.resolution = f'{int(clip.w)}x{int(clip.h)}'
-                metadata.fps = clip.fps
-                clip.close()
+                metadata.resolution = f'{info["width"]}x{info["height"]}'
+                metadata.bitrate = info.get('bitrate')
 
             elif self._is_audio_file(file_path):
                 # Audio-Metadaten
-                from pydub import AudioSegment  # type: ignore
-
-                audio = AudioSegment.from_file(str(file_path))
-                metadata.duration = len(audio) / 1000.0  # Konvertiere zu Sekunden
-                metadata.channels = audio.channels
-                metadata.sample_rate = audio.frame_rate
+                info = self._audio_info(file_path)
+                metadata.duration = info['duration']
+                metadata.bitrate = info.get('bitrate')
 
-        except (OSError, RuntimeError, AttributeError):
+        except (OSError, RuntimeError, AttributeError, ImportError):
             pass
 
         return metadata
@@ -160,115 +234,289 @@ class MediaExtractor(BaseExtractor):
 
     def _get_mime_type(self, file_path: Path) -> str:
         """Ermittelt den MIME-Type der Mediendatei."""
-        extension = file_path.suffix.lower()
-        mime_types = {
-            # Video
-            '.mp4': 'video/mp4',
-            '.avi': 'video/avi',
-            '.mov': 'video/quicktime',
-            '.wmv': 'video/x-ms-wmv',
-            '.flv': 'video/x-flv',
-            '.webm': 'video/webm',
-            '.mkv': 'video/x-matroska',
-            # Audio
-            '.mp3': 'audio/mpeg',
-            '.wav': 'audio/wav',
-            '.flac': 'audio/flac',
-            '.aac': 'audio/aac',
-            '.ogg': 'audio/ogg',
-        }
-        return mime_types.get(extension, 'application/octet-stream')
+        return _MIME_BY_EXT.get(file_path.suffix.lower(), 'application/octet-stream')
 
     def _is_video_file(self, file_path: Path) -> bool:
         """Prüft, ob es sich um eine Videodatei handelt."""
-        video_extensions = [
-            '.mp4',
-            '.avi',
-            '.mov',
-            '.wmv',
-            '.flv',
-            '.webm',
-            '.mkv',
-            '.m4v',
-        ]
-        return file_path.suffix.lower() in video_extensions
+        return file_path.suffix.lower() in _VIDEO_EXTENSIONS
 
     def _is_audio_file(self, file_path: Path) -> bool:
         """Prüft, ob es sich um eine Audiodatei handelt."""
-        audio_extensions = ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma']
-        return file_path.suffix.lower() in audio_extensions
+        return file_path.suffix.lower() in _AUDIO_EXTENSIONS
 
     def _transcribe_audio(self, file_path: Path) -> str:
         """Transkribiert eine Audiodatei."""
         try:
             # Audio zu WAV konvertieren (für bessere Kompatibilität)
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_wav:
+            wav = self._convert_to_wav(file_path)
+            if wav is None:
                 from pydub import AudioSegment  # type: ignore
 
-                audio = AudioSegment.from_file(str(file_path))
-                audio.export(temp_wav.name, format='wav')
-                temp_wav_path = temp_wav.name
-
-            try:
-                # Speech Recognition
-                import speech_recognition as sr  # type: ignore
+                wav = io.BytesIO()
+                AudioSegment.from_file(str(file_path)).export(wav, format='wav')
+                wav.seek(0)
 
-                recognizer = sr.Recognizer()
-                with sr.AudioFile(temp_wav_path) as source:
-                    audio_data = recognizer.record(source)
-                    return recognizer.recognize_google(audio_data, language='de-DE')
-            finally:
-                # Temporäre Datei löschen
-                path_obj = Path(temp_wav_path)
-                if path_obj.exists():
-                    path_obj.unlink(missing_ok=True)
+            return self._recognize_wav(wav)
 
-        except (OSError, RuntimeError, AttributeError):
+        except (
+            OSError,
+            RuntimeError,
+            AttributeError,
+            ImportError,
+            subprocess.SubprocessError,
+        ):
             return ''
 
     def _transcribe_video(self, file_path: Path) -> str:
         """Transkribiert ein Video (extrahiert Audio und transkribiert)."""
         try:
             # Audio aus Video extrahieren
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                from moviepy.editor import VideoFileClip  # type: ignore
-
-                video = VideoFileClip(str(file_path))
-                video.audio.write_audiofile(temp_audio.name, verbose=False, logger=None)
-                video.close()
-                temp_audio_path = temp_audio.name
-
-            try:
-                # Audio transkribieren
-                return self._transcribe_audio(Path(temp_audio_path))
-            finally:
-                # Temporäre Datei löschen
-                path_obj = Path(temp_audio_path)
-                if path_obj.exists():
-                    path_obj.unlink(missing_ok=True)
-
-        except (OSError, RuntimeError, AttributeError):
+            wav = self._convert_to_wav(file_path)
+            if wav is None:
+                wav = self._extract_audio_moviepy(file_path)
+
+            # Audio transkribieren
+            return self._recognize_wav(wav)
+
+        except (
+            OSError,
+            RuntimeError,
+            AttributeError,
+            ImportError,
+            subprocess.SubprocessError,
+        ):
             return ''
 
+    def _extract_audio_moviepy(self, file_path: Path) -> io.BytesIO:
+        """Extrahiert die Tonspur mit MoviePy (schreibt nur in Dateien)."""
+        from moviepy.editor import VideoFileClip  # type: ignore
+
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
+            temp_audio_path = Path(temp_audio.name)
+
+        try:
+            video = VideoFileClip(str(file_path))
+            video.audio.write_audiofile(
+                str(temp_audio_path),
+                verbose=False,
+                logger=None,
+            )
+            video.close()
+            return io.BytesIO(temp_audio_path.read_bytes())
+        finally:
+            # Temporäre Datei löschen
+            temp_audio_path.unlink(missing_ok=True)
+
+    def _convert_to_wav(self, file_path: Path) -> io.BytesIO | None:
+        """
+        Wandelt die Tonspur per ffmpeg im Speicher in Mono-WAV mit 16 kHz um.
+
+        Videoframes werden dabei nicht dekodiert; Mono/16 kHz ist zudem das
+        Eingabeformat der Spracherkennung und erspart dort das Resampling.
+        ffmpeg liefert rohes PCM über eine Pipe, der WAV-Header wird hier
+        geschrieben (über eine Pipe kann ffmpeg die Längenfelder nicht setzen).
+
+        Returns:
+            WAV-Daten, None wenn ffmpeg nicht installiert ist
+        """
+        if FFMPEG_PATH is None:
+            return None
+
+        result = subprocess.run(
+            [
+                FFMPEG_PATH,
+                '-v',
+                'error',
+                '-i',
+                str(file_path),
+                '-vn',
+                '-ac',
+                '1',
+                '-ar',
+                str(_WAV_RATE),
+                '-f',
+                's16le',
+                'pipe:1',
+            ],
+            capture_output=True,
+            check=True,
+            timeout=settings.extract_timeout,
+        )
+
+        wav = io.BytesIO()
+        with wave.open(wav, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(_WAV_RATE)
+            writer.writeframes(result.stdout)
+        wav.seek(0)
+        return wav
+
+    def _recognize_wav(self, wav: io.BytesIO) -> str:
+        """Führt die Spracherkennung auf WAV-Daten aus."""
+        if WHISPER_AVAILABLE:
+            segments, _info = self._get_whisper_model().transcribe(
+                wav,
+                language='de',
+                beam_size=1,
+            )
+            return ' '.join(segment.text.strip() for segment in segments)
+
+        try:
+            from pydub import AudioSegment  # type: ignore
+            from pydub.silence import split_on_silence  # type: ignore
+        except ImportError:
+            import speech_recognition as sr  # type: ignore
+
+            recognizer = sr.Recognizer()
+            with sr.AudioFile(wav) as source:
+                audio_data = recognizer.record(source)
+                return recognizer.recognize_google(audio_data, language='de-DE')
+
+        # An Sprechpausen aufteilen und die Abschnitte parallel erkennen lassen;
+        # die Laufzeit hängt so nicht mehr linear von der Länge der Datei ab
+        audio = AudioSegment.from_wav(wav)
+        chunks = split_on_silence(
+            audio,
+            min_silence_len=500,
+            silence_thresh=audio.dBFS - 14,
+            keep_silence=250,
+        )
+        if len(chunks) <= 1:
+            texts = [_recognize_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(_TRANSCRIBE_WORKERS, len(chunks)),
+            ) as executor:
+                texts = list(executor.map(_recognize_chunk, chunks))
+
+        return ' '.join(text for text in texts if text)
+
+    @classmethod
+    def _get_whisper_model(cls) -> Any:
+        """Gibt das (einmal pro Prozess geladene) Whisper-Modell zurück."""
+        model = cls._whisper_model
+        if model is None:
+            with cls._whisper_lock:
+                model = cls._whisper_model
+                if model is None:
+                    from faster_whisper import WhisperModel  # type: ignore
+
+                    model = cls._whisper_model = WhisperModel(
+                        settings.whisper_model,
+                        compute_type=settings.whisper_compute_type,
+                    )
+        return model
+
+    def _probe(self, file_path: Path, codec_type: str) -> dict[str, Any] | None:
+        """
+        Liest Stream-Informationen per ffprobe, ohne die Datei zu dekodieren.
+
+        Returns:
+            Dauer, Bitrate und Stream-Werte, None ohne ffprobe oder passenden Stream
+        """
+        if FFPROBE_PATH is None:
+            return None
+
+        try:
+            result = subprocess.run(
+                [
+                    FFPROBE_PATH,
+                    '-v',
+                    'error',
+                    '-print_format',
+                    'json',
+                    '-show_streams',
+                    '-show_format',
+                    str(file_path),
+                ],
+                capture_output=True,
+                check=True,
+                timeout=_FFPROBE_TIMEOUT,
+            )
+            probe = json.loads(result.stdout)
+            stream = next(
+                (
+                    s
+                    for s in probe.get('streams', [])
+                    if s.get('codec_type') == codec_type
+                ),
+                None,
+            )
+            if stream is None:
+                return None
+
+            fmt = probe.get('format', {})
+            bitrate = fmt.get('bit_rate') or stream.get('bit_rate')
+            info: dict[str, Any] = {
+                'duration': float(fmt.get('duration') or stream.get('duration') or 0),
+                'bitrate': int(bitrate) if bitrate else None,
+            }
+            if codec_type == 'video':
+                info['width'] = int(stream['width'])
+                info['height'] = int(stream['height'])
+                info['fps'] = _frame_rate(stream.get('avg_frame_rate')) or _frame_rate(
+                    stream.get('r_frame_rate'),
+                )
+            else:
+                info['channels'] = stream.get('channels')
+                info['sample_rate'] = int(stream['sample_rate'])
+
+        except (OSError, subprocess.SubprocessError, ValueError, KeyError) as e:
+            self.logger.debug('ffprobe failed', filename=file_path.name, error=str(e))
+            return None
+
+        return info
+
+    def _video_info(self, file_path: Path) -> dict[str, Any]:
+        """Ermittelt Dauer, Auflösung und Bildrate eines Videos."""
+        info = self._probe(file_path, 'video')
+        if info is not None:
+            return info
+
+        from moviepy.editor import VideoFileClip  # type: ignore
+
+        clip = VideoFileClip(str(file_path))
+        try:
+            return {
+                'duration': clip.duration,
+                'width': int(clip.w),
+                'height': int(clip.h),
+                'fps': clip.fps,
+            }
+        finally:
+            clip.close()
+
+    def _audio_info(self, file_path: Path) -> dict[str, Any]:
+        """Ermittelt Dauer, Kanäle und Abtastrate einer Audiodatei."""
+        info = self._probe(file_path, 'audio')
+        if info is not None:
+            return info
+
+        from pydub import AudioSegment  # type: ignore
+
+        audio = AudioSegment.from_file(str(file_path))
+        return {
+            'duration': len(audio) / 1000.0,  # Konvertiere zu Sekunden
+            'channels': audio.channels,
+            'sample_rate': audio.frame_rate,
+        }
+
     def _extract_video_info(self, file_path: Path) -> ExtractedMedia:
         """Extrahiert Video-Informationen."""
         try:
-            from moviepy.editor import VideoFileClip  # type: ignore
-
-            clip = VideoFileClip(str(file_path))
+            info = self._video_info(file_path)
 
-            media_info = ExtractedMedia(
+            return ExtractedMedia(
                 media_type='video',
                 format=file_path.suffix.lower()[1:],  # Ohne Punkt
-                duration=clip.duration,
-                resolution=f'{int(clip.w)}x{int(clip.h)}',
-                fps=clip.fps,
+                duration=info['duration'],
+                bitrate=info.get('bitrate'),
+                resolution=f'{info["width"]}x{info["height"]}',
+                fps=info['fps'],
             )
 
-            clip.close()
-            return media_info
-
-        except (OSError, RuntimeError, AttributeError):
+        except (OSError, RuntimeError, AttributeError, ImportError):
             # Fallback-Informationen
             return ExtractedMedia(
                 media_type='video',
@@ -279,19 +527,18 @@ class MediaExtractor(BaseExtractor):
     def _extract_audio_info(self, file_path: Path) -> ExtractedMedia:
         """Extrahiert Audio-Informationen."""
         try:
-            from pydub import AudioSegment  # type: ignore
-
-            audio = AudioSegment.from_file(str(file_path))
+            info = self._audio_info(file_path)
 
             return ExtractedMedia(
                 media_type='audio',
                 format=file_path.suffix.lower()[1:],  # Ohne Punkt
-                duration=len(audio) / 1000.0,  # Konvertiere zu Sekunden
-                channels=audio.channels,
-                sample_rate=audio.frame_rate,
+                duration=info['duration'],
+                bitrate=info.get('bitrate'),
+                channels=info['channels'],
+                sample_rate=info['sample_rate'],
             )
 
-        except (OSError, RuntimeError, AttributeError):
+        except (OSError, RuntimeError, AttributeError, ImportError):
             # Fallback-Informationen
             return ExtractedMedia(
                 media_type='audio',
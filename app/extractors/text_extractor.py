@@ -4,19 +4,63 @@ Extraktor für einfache Textdateien (TXT, CSV, JSON, XML).
 
 import csv
 import json
+import os
 import re
+from collections.abc import Mapping
 from datetime import UTC, datetime
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any
 
-from defusedxml import ElementTree as ElementTree
+from lxml import etree
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from app.extractors.base import BaseExtractor
 from app.models.schemas import ExtractedText, FileMetadata, StructuredData
 
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+# JSON-Dokumente mit einem Objekt als Wurzel (optional mit UTF-8-BOM)
+_JSON_OBJECT_START = re.compile(rb'(?:\xef\xbb\xbf)?\s*\{')
+
+# MIME-Types nach Dateiendung
+_MIME_BY_EXT: Mapping[str, str] = MappingProxyType(
+    {
+        '.txt': 'text/plain',
+        '.csv': 'text/csv',
+        '.json': 'application/json',
+        '.xml': 'application/xml',
+        '.html': 'text/html',
+        '.htm': 'text/html',
+    },
+)
+
+
+def _json_loads(raw: bytes) -> Any:
+    """
+    Dekodiert JSON-Bytes, bevorzugt mit orjson.
+
+    json dient als Fallback für Eingaben, die orjson ablehnt, die json aber
+    akzeptiert (NaN/Infinity, Ganzzahlen über 64 Bit, BOM).
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
 
 class TextExtractor(BaseExtractor):
     """Extraktor für einfache Textdateien."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.supported_extensions = ['.txt', '.csv', '.json', '.xml', '.html', '.htm']
@@ -32,14 +76,16 @@ class TextExtractor(BaseExtractor):
 
     def can_extract(self, file_path: Path, mime_type: str) -> bool:
         """Prüft, ob der Extraktor die Datei verarbeiten kann."""
-        return (
-            file_path.suffix.lower() in self.supported_extensions
-            or mime_type in self.supported_mime_types
-        )
+        return self._matches_format(file_path, mime_type)
 
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
         """Extrahiert Metadaten aus der Textdatei."""
-        stat = file_path.stat()
+        stat = file_path.stat() if st is None else st
 
         metadata = FileMetadata(
             filename=file_path.name,
@@ -53,8 +99,10 @@ class TextExtractor(BaseExtractor):
         # Zusätzliche Metadaten basierend auf Dateityp
         if file_path.suffix.lower() == '.json':
             try:
-                with file_path.open(encoding='utf-8') as f:
-                    data = json.load(f)
+                raw = file_path.read_bytes()
+                # Nur Objekte liefern Metadaten; Listen u. Ä. nicht parsen
+                if _JSON_OBJECT_START.match(raw):
+                    data = _json_loads(raw)
                     if isinstance(data, dict):
                         metadata.title = data.get('title') or data.get('name')
                         metadata.author = data.get('author') or data.get('creator')
@@ -106,16 +154,7 @@ class TextExtractor(BaseExtractor):
 
     def _get_mime_type(self, file_path: Path) -> str:
         """Ermittelt den MIME-Type der Datei."""
-        extension = file_path.suffix.lower()
-        mime_types = {
-            '.txt': 'text/plain',
-            '.csv': 'text/csv',
-            '.json': 'application/json',
-            '.xml': 'application/xml',
-            '.html': 'text/html',
-            '.htm': 'text/html',
-        }
-        return mime_types.get(extension, 'text/plain')
+        return _MIME_BY_EXT.get(file_path.suffix.lower(), 'text/plain')
 
     def _clean_text(self, text: str) -> str:
         """Bereinigt den Text."""
@@ -150,8 +189,7 @@ class TextExtractor(BaseExtractor):
     def _extract_json_structure(self, file_path: Path) -> StructuredData:
         """Extrahiert Struktur aus JSON-Dateien."""
         try:
-            with file_path.open(encoding='utf-8') as f:
-                data = json.load(f)
+            data = _json_loads(file_path.read_bytes())
 
             # Einfache Struktur-Analyse
             structure_info = {
@@ -167,32 +205,66 @@ class TextExtractor(BaseExtractor):
             return StructuredData()
 
     def _extract_xml_structure(self, file_path: Path) -> StructuredData:
-        """Extrahiert Struktur aus XML/HTML-Dateien."""
+        """
+        Extrahiert Links und Überschriften aus XML/HTML-Dateien.
+
+        Die Datei wird in einem Durchlauf gestreamt (lxml iterparse); bereits
+        verarbeitete Elemente werden wieder freigegeben, sodass der Baum nie
+        vollständig im Speicher liegt. Entitäten und Netzwerkzugriffe sind
+        deaktiviert (Schutz vor XXE/Billion Laughs).
+        """
+        links = []
+        headings = []
+        # Überschriften, deren Text erst beim End-Event vollständig ist
+        pending = {}
+        position = -1
+        depth = 0
+
         try:
-            tree = ElementTree.parse(file_path)
-            root = tree.getroot()
-
-            # Links extrahieren
-            links = []
-            for elem in root.iter():
-                if elem.tag.endswith('a') and elem.get('href'):
-                    links.append(elem.get('href'))
-
-            # Überschriften extrahieren
-            headings = []
-            for i, elem in enumerate(root.iter()):
-                if elem.tag.endswith(('h1', 'h2', 'h3', 'h4', 'h5', 'h6')):
-                    headings.append(
-                        {
-                            'level': int(elem.tag[-1]),
-                            'text': elem.text or '',
-                            'position': i,
-                        },
-                    )
+            context = etree.iterparse(
+                str(file_path),
+                events=('start', 'end'),
+                resolve_entities=False,
+                no_network=True,
+            )
+            for event, elem in context:
+                if event == 'start':
+                    # Position entspricht der Dokumentreihenfolge aller Elemente
+                    position += 1
+                    depth += 1
+                    tag = elem.tag
+                    if tag.endswith('a'):
+                        # Links extrahieren
+                        href = elem.get('href')
+                        if href:
+                            links.append(href)
+                    elif tag.endswith(_HEADING_TAGS):
+                        # Überschriften extrahieren
+                        heading = {
+                            'level': int(tag[-1]),
+                            'text': '',
+                            'position': position,
+                        }
+                        headings.append(heading)
+                        pending[elem] = heading
+                    continue
+
+                depth -= 1
+                if pending:
+                    heading = pending.pop(elem, None)
+                    if heading is not None:
+                        heading['text'] = elem.text or ''
+
+                # Abgeschlossene Kinder des Wurzelelements freigeben
+                if depth == 1:
+                    elem.clear(keep_tail=True)
+                    parent = elem.getparent()
+                    while elem.getprevious() is not None:
+                        del parent[0]
 
             return StructuredData(
                 links=links,
                 headings=headings,
             )
-        except (OSError, ValueError, TypeError):
+        except (OSError, ValueError, TypeError, etree.XMLSyntaxError):
             return StructuredData()
@@ -16,12 +16,15 @@ from app.extractors.base import BaseExtractor
 from app.models.schemas import ExtractedText, FileMetadata, StructuredData
 
 if TYPE_CHECKING:
+    import os
     from pathlib import Path
 
 
 class TikaExtractor(BaseExtractor):
     """Extraktor, der Apache Tika Server via REST anspricht."""
 
+    __slots__ = ('_client', '_tracer')
+
     def __init__(self) -> None:
         super().__init__()
         # Breite Abdeckung – Tika unterstützt viele Formate. Wir setzen hier keine harte Liste,
@@ -58,8 +61,13 @@ class TikaExtractor(BaseExtractor):
         except httpx.RequestError:
             return False
 
-    def extract_metadata(self, file_path: Path) -> FileMetadata:
-        stat = file_path.stat()
+    def extract_metadata(
+        self,
+        file_path: Path,
+        *,
+        st: os.stat_result | None = None,
+    ) -> FileMetadata:
+        stat = file_path.stat() if st is None else st
         metadata = FileMetadata(
             filename=file_path.name,
             file_size=stat.st_size,
@@ -153,6 +153,8 @@ async def lifespan(app: FastAPI):
             queue = get_job_queue()
             if hasattr(queue, 'redis_client'):
                 queue.redis_client.close()
+            if hasattr(queue, 'redis_pool'):
+                queue.redis_pool.disconnect()
         except (AttributeError, RuntimeError, OSError) as err:
             logger.warning('Error closing Redis connections', error=str(err))
 
@@ -227,8 +229,8 @@ if settings.enable_opentelemetry:
         )
 
 # Security Middleware hinzufügen
-for middleware_class in get_security_middleware():
-    app.add_middleware(middleware_class)
+for middleware in get_security_middleware():
+    app.add_middleware(middleware.cls, *middleware.args, **middleware.kwargs)
 
 # Request Logging Middleware
 app.add_middleware(RequestLoggingMiddleware)
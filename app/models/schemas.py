@@ -258,6 +258,20 @@ class ExtractionResult(BaseModel):
     )
 
 
+class BatchExtractionResult(BaseModel):
+    """Ergebnis einer Batch-Extraktion mehrerer Dateien."""
+
+    results: dict[str, ExtractionResult] = Field(
+        default_factory=dict,
+        description='Extraktionsergebnisse je Dateipfad',
+    )
+    failures: dict[str, str] = Field(
+        default_factory=dict,
+        description='Fehlermeldungen je Dateipfad',
+    )
+    total_time: float = Field(description='Gesamtdauer in Sekunden')
+
+
 class AsyncExtractionRequest(BaseModel):
     """Request für asynchrone Extraktion."""
 
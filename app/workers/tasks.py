@@ -21,6 +21,11 @@ from app.core.security import ensure_safe_callback_url
 from app.extractors import get_extractor
 
 celery = Celery('file_extractor', broker=settings.redis_url, backend=settings.redis_url)
+celery.conf.update(
+    task_serializer=settings.celery_task_serializer,
+    accept_content=settings.celery_accept_content.split(','),
+    result_serializer=settings.celery_result_serializer,
+)
 logger = get_logger('worker_tasks')
 
 
@@ -110,8 +115,11 @@ def extract_file_task(job_id: str) -> dict[str, Any]:
             include_structure=include_structure,
         )
 
-        # Ergebnis in Dict konvertieren (für Metriken und Speicherung)
-        result_dict = result if isinstance(result, dict) else result.dict()
+        # Ergebnis in Dict konvertieren (für Metriken und Speicherung);
+        # mode='json' liefert nur primitive Typen, die msgpack serialisieren kann
+        result_dict = (
+            result if isinstance(result, dict) else result.model_dump(mode='json')
+        )
 
         # Extraktionsdauer berechnen
         duration = time.time() - start_time
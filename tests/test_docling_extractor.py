@@ -0,0 +1,175 @@
+"""Tests für den Docling-Extraktor (mit einer docling-Attrappe)."""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.extractors import docling_extractor
+
+_ENRICHMENT_NAMES = (
+    'EntityEnrichment',
+    'ImageEnrichment',
+    'LanguageEnrichment',
+    'LinkEnrichment',
+    'MetadataEnrichment',
+    'SentimentEnrichment',
+    'StructureEnrichment',
+    'SummaryEnrichment',
+    'TableEnrichment',
+    'TextEnrichment',
+)
+
+
+@pytest.fixture
+def fake_docling(monkeypatch):
+    """Ersetzt docling durch eine Attrappe, die Aufrufe zählt."""
+    calls = Counter()
+    lock = threading.Lock()
+
+    def count(name: str) -> None:
+        with lock:
+            calls[name] += 1
+
+    class Document:
+        text = 'Ein kurzer Text'
+
+        def __init__(self):
+            self.metadata = {'title': 'Titel'}
+
+        @classmethod
+        def from_file(cls, _path):
+            count('from_file')
+            # Parsen dauert, damit sich parallele Schritte überschneiden
+            time.sleep(0.05)
+            return cls()
+
+    class Pipeline:
+        def __init__(self):
+            self.enrichments = []
+
+        def add_enrichment(self, enrichment):
+            self.enrichments.append(enrichment)
+
+        def process(self, doc):
+            count('process')
+            for enrichment in self.enrichments:
+                doc = enrichment.enrich(doc)
+            return doc
+
+    active = Counter()
+
+    def enrichment_cls(name: str) -> type:
+        def enrich(self, doc):
+            count(name)
+            # Gleichzeitige Aufrufe derselben Instanz erfassen
+            with lock:
+                active[self] += 1
+                calls['max_concurrent_enrich'] = max(
+                    calls['max_concurrent_enrich'],
+                    active[self],
+                )
+            time.sleep(0.005)
+            with lock:
+                active[self] -= 1
+            return doc
+
+        return type(name, (), {'enrich': enrich})
+
+    namespace = SimpleNamespace(
+        Document=Document,
+        Pipeline=Pipeline,
+        **{name: enrichment_cls(name) for name in _ENRICHMENT_NAMES},
+    )
+    monkeypatch.setattr(docling_extractor, 'DOCLING_AVAILABLE', True)
+    monkeypatch.setattr(docling_extractor, '_import_docling', lambda: namespace)
+    return calls
+
+
+def test_extract_parses_file_once(fake_docling, tmp_path):
+    """Testet, dass parallele Extraktionsschritte eine Konvertierung teilen."""
+    file_path = tmp_path / 'dokument.pdf'
+    file_path.write_bytes(b'%PDF-1.4\n')
+    extractor = docling_extractor.DoclingExtractor()
+
+    result = extractor.extract(file_path, include_structure=True)
+
+    assert result.success, result.errors
+    assert result.extracted_text.content == 'Ein kurzer Text'
+    assert fake_docling['from_file'] == 1
+    assert fake_docling['process'] == 1
+
+    # Ergebnisse gelten nur für einen Aufruf, ein weiterer parst erneut
+    extractor.extract(file_path, include_structure=True)
+    assert fake_docling['from_file'] == 2
+
+
+@pytest.mark.parametrize(
+    ('include', 'expected'),
+    [
+        (
+            {},
+            {'MetadataEnrichment', 'TextEnrichment', 'LanguageEnrichment'},
+        ),
+        (
+            {'include_text': False},
+            {'MetadataEnrichment'},
+        ),
+        (
+            {'include_structure': True},
+            {
+                'MetadataEnrichment',
+                'TextEnrichment',
+                'LanguageEnrichment',
+                'StructureEnrichment',
+                'TableEnrichment',
+                'ImageEnrichment',
+                'LinkEnrichment',
+            },
+        ),
+    ],
+)
+def test_extract_runs_only_requested_enrichments(
+    fake_docling,
+    tmp_path,
+    include,
+    expected,
+):
+    """Testet, dass extract() nur die Enrichments der angeforderten Schritte ausführt."""
+    file_path = tmp_path / 'dokument.pdf'
+    file_path.write_bytes(b'%PDF-1.4\n')
+    extractor = docling_extractor.DoclingExtractor()
+
+    result = extractor.extract(file_path, **include)
+
+    assert result.success, result.errors
+    ran = {name for name in _ENRICHMENT_NAMES if fake_docling[name]}
+    assert ran == expected
+    assert all(fake_docling[name] == 1 for name in ran)
+
+
+def test_shared_enrichments_not_called_concurrently(fake_docling, tmp_path):
+    """Testet, dass gemeinsam genutzte Enrichments nicht parallel laufen."""
+    paths = []
+    for i in range(4):
+        file_path = tmp_path / f'dokument{i}.pdf'
+        file_path.write_bytes(b'%PDF-1.4\n' + bytes([i]))
+        paths.append(file_path)
+    extractor = docling_extractor.DoclingExtractor()
+
+    # Unterschiedliche Schritte nutzen unterschiedliche Pipelines, teilen sich
+    # aber dieselben Enrichment-Instanzen
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda args: extractor.extract(args[0], include_structure=args[1]),
+                zip(paths, (False, True, False, True), strict=True),
+            ),
+        )
+
+    assert all(result.success for result in results)
+    assert fake_docling['TextEnrichment'] == 4
+    assert fake_docling['max_concurrent_enrich'] == 1
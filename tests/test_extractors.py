@@ -1,10 +1,18 @@
 """Tests für die Extraktoren."""
 
+import json
+import subprocess
+import threading
+import time
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
 
+from app.core.config import settings
+from app.core.exceptions import TimeoutException
 from app.extractors.base import BaseExtractor
+from app.models.schemas import ExtractedText, StructuredData
 
 
 def test_base_extractor_abstract_methods():
@@ -63,3 +71,257 @@ def test_mock_extractor_can_extract():
 
     # Sollte andere Dateien nicht erkennen
     assert not extractor.can_extract(Path('test.txt'), 'text/plain')
+
+
+class _FakePdfiumTextPage:
+    """Textseite mit PDFium-typischen \\r\\n-Zeilenumbrüchen."""
+
+    def __init__(self, text: str):
+        self._text = text
+
+    def get_text_range(self) -> str:
+        # PDFium darf nur unter dem gemeinsamen Lock genutzt werden
+        from app.extractors.pdf_extractor import _PDFIUM_LOCK
+
+        assert _PDFIUM_LOCK.locked()
+        return self._text
+
+    def close(self) -> None:
+        pass
+
+
+class _FakePdfiumPage:
+    def __init__(self, text: str):
+        self._text = text
+
+    def get_textpage(self) -> _FakePdfiumTextPage:
+        return _FakePdfiumTextPage(self._text)
+
+    def close(self) -> None:
+        pass
+
+
+def test_pdf_pdfium_line_breaks_normalized(monkeypatch, tmp_path):
+    """Testet, dass PDFium-Seitentexte wie PyPDF2-Texte ausgewertet werden."""
+    from types import SimpleNamespace
+
+    from app.extractors import pdf_extractor
+
+    lines = ['KAPITEL EINS', 'Name   Wert', 'Alpha   1', 'Fließtext endet hier.']
+    page_text = '\r\n'.join(lines) + '\r\n'
+
+    class FakePdfDocument:
+        def __init__(self, _path):
+            pass
+
+        def __iter__(self):
+            return iter([_FakePdfiumPage(page_text)])
+
+        def close(self) -> None:
+            pass
+
+    fake_pdfium = SimpleNamespace(
+        PdfDocument=FakePdfDocument,
+        PdfiumError=type('PdfiumError', (Exception,), {}),
+    )
+    monkeypatch.setattr(pdf_extractor, 'pdfium', fake_pdfium, raising=False)
+    monkeypatch.setattr(pdf_extractor, 'PDFIUM_AVAILABLE', True)
+
+    file_path = tmp_path / 'dokument.pdf'
+    file_path.write_bytes(b'%PDF-1.4\n')
+    extractor = pdf_extractor.PDFExtractor()
+
+    structured = extractor.extract_structured_data(file_path)
+
+    assert structured.tables[0]['rows'] == ['Name   Wert', 'Alpha   1']
+    assert [h['text'] for h in structured.headings] == lines[:3]
+    assert [h['position'] for h in structured.headings] == [0, 1, 2]
+    assert extractor.extract_text(file_path).content == (
+        'KAPITEL EINS Name Wert Alpha 1 Fließtext endet hier.'
+    )
+
+
+class _StageExtractor(BaseExtractor):
+    """Extraktor, dessen Schritte einen Callback mit dem Schrittnamen aufrufen."""
+
+    __slots__ = ('stage',)
+
+    def __init__(self, stage: Callable[[str], None]):
+        super().__init__()
+        self.stage = stage
+
+    def can_extract(self, file_path: Path, mime_type: str) -> bool:
+        return True
+
+    def extract_metadata(self, file_path: Path, *, st=None):
+        self.stage('metadata')
+        return self._create_fallback_metadata(file_path, st)
+
+    def extract_text(self, file_path: Path):
+        self.stage('text')
+        return ExtractedText(content='Inhalt', word_count=1, character_count=6)
+
+    def extract_structured_data(self, file_path: Path):
+        self.stage('structure')
+        return StructuredData()
+
+
+@pytest.fixture
+def text_file(tmp_path) -> Path:
+    file_path = tmp_path / 'datei.txt'
+    file_path.write_text('Inhalt')
+    return file_path
+
+
+def test_extract_runs_stages_concurrently(text_file):
+    """Testet, dass extract() die angeforderten Schritte parallel ausführt."""
+    # Die Barriere öffnet sich nur, wenn alle drei Schritte gleichzeitig laufen
+    barrier = threading.Barrier(3, timeout=5)
+    extractor = _StageExtractor(lambda _stage: barrier.wait())
+
+    result = extractor.extract(text_file, include_structure=True)
+
+    assert result.success, result.errors
+    assert result.extracted_text.content == 'Inhalt'
+    assert result.structured_data is not None
+
+
+@pytest.mark.asyncio
+async def test_extract_async_runs_stages_concurrently(text_file):
+    """Testet, dass extract_async() die Schritte parallel ausführt."""
+    barrier = threading.Barrier(3, timeout=5)
+    extractor = _StageExtractor(lambda _stage: barrier.wait())
+
+    result = await extractor.extract_async(text_file, include_structure=True)
+
+    assert result.success, result.errors
+
+
+def test_extract_collects_stage_errors(text_file):
+    """Testet, dass ein fehlgeschlagener Schritt die anderen nicht abbricht."""
+
+    def stage(name: str) -> None:
+        if name == 'text':
+            raise ValueError('kaputt')
+
+    result = _StageExtractor(stage).extract(text_file, include_structure=True)
+
+    assert not result.success
+    assert result.errors == ['Text-Extraktion fehlgeschlagen: kaputt']
+    assert result.extracted_text is None
+    assert result.file_metadata.filename == 'datei.txt'
+    assert result.structured_data is not None
+
+
+def test_extract_timeout_stops_waiting(monkeypatch, text_file):
+    """Testet, dass extract() nach Ablauf des Timeouts nicht weiter wartet."""
+    monkeypatch.setattr(settings, 'extract_timeout', 0.2)
+
+    def stage(name: str) -> None:
+        if name == 'text':
+            time.sleep(1)
+
+    start = time.perf_counter()
+    with pytest.raises(TimeoutException):
+        _StageExtractor(stage).extract(text_file)
+    assert time.perf_counter() - start < 0.9
+
+
+def test_pdf_stages_share_page_texts(monkeypatch, tmp_path):
+    """Testet, dass Text- und Struktur-Extraktion die Seiten einmal lesen."""
+    from app.extractors.pdf_extractor import PDFExtractor
+
+    reads = []
+
+    def read_page_texts(_self, file_path):
+        reads.append(file_path)
+        # Lesen dauert, damit sich die parallelen Schritte überschneiden
+        time.sleep(0.05)
+        return ['KAPITEL EINS\nErster Absatz.']
+
+    monkeypatch.setattr(PDFExtractor, '_read_page_texts', read_page_texts)
+    file_path = tmp_path / 'dokument.pdf'
+    file_path.write_bytes(b'%PDF-1.4\n')
+
+    result = PDFExtractor().extract(file_path, include_structure=True)
+
+    assert reads == [file_path]
+    assert result.extracted_text.content == 'KAPITEL EINS Erster Absatz.'
+    assert result.structured_data.headings[0]['text'] == 'KAPITEL EINS'
+
+
+def test_docx_extraction(tmp_path):
+    """Testet Text, Überschriften und Tabellen aus einer DOCX-Datei."""
+    docx = pytest.importorskip('docx')
+    from app.extractors.docx_extractor import DOCXExtractor
+
+    document = docx.Document()
+    document.core_properties.title = 'Bericht'
+    document.add_heading('Einleitung', level=1)
+    document.add_paragraph('Erster Absatz mit Text.')
+    document.add_heading('Details', level=2)
+    table = document.add_table(rows=2, cols=2)
+    for row, texts in enumerate((('Name', 'Wert'), ('Alpha', '1'))):
+        for col, text in enumerate(texts):
+            table.cell(row, col).text = text
+    file_path = tmp_path / 'bericht.docx'
+    document.save(file_path)
+
+    result = DOCXExtractor().extract(file_path, include_structure=True)
+
+    assert result.success, result.errors
+    assert result.file_metadata.title == 'Bericht'
+    assert result.extracted_text.content == (
+        'Einleitung Erster Absatz mit Text. Details Name Wert Alpha 1'
+    )
+    assert result.structured_data.headings == [
+        {'level': 1, 'text': 'Einleitung', 'position': 0},
+        {'level': 2, 'text': 'Details', 'position': 1},
+    ]
+    assert result.structured_data.tables == [
+        {
+            'headers': ['Name', 'Wert'],
+            'rows': [['Alpha', '1']],
+            'row_count': 1,
+            'column_count': 2,
+        },
+    ]
+
+
+def test_media_metadata_from_ffprobe(monkeypatch, tmp_path):
+    """Testet, dass Video-Metadaten aus der ffprobe-Ausgabe übernommen werden."""
+    from app.extractors import media_extractor
+
+    probe = {
+        'streams': [
+            {'codec_type': 'audio', 'channels': 2, 'sample_rate': '48000'},
+            {
+                'codec_type': 'video',
+                'width': 1920,
+                'height': 1080,
+                'avg_frame_rate': '30000/1001',
+            },
+        ],
+        'format': {'duration': '12.5', 'bit_rate': '800000'},
+    }
+    commands = []
+
+    def run(command, **_kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 0, json.dumps(probe).encode(), b'')
+
+    monkeypatch.setattr(media_extractor, 'FFPROBE_PATH', 'ffprobe')
+    monkeypatch.setattr(media_extractor.subprocess, 'run', run)
+    file_path = tmp_path / 'clip.mp4'
+    file_path.write_bytes(b'\x00' * 16)
+    extractor = media_extractor.MediaExtractor()
+
+    metadata = extractor.extract_metadata(file_path)
+    media = extractor.extract_structured_data(file_path).media[0]
+
+    assert commands[0][0] == 'ffprobe'
+    assert metadata.duration == 12.5
+    assert metadata.resolution == '1920x1080'
+    assert metadata.bitrate == 800000
+    assert media.fps == pytest.approx(29.97, abs=0.01)
+    assert media.resolution == '1920x1080'
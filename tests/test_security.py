@@ -0,0 +1,52 @@
+"""Tests für die Security-Middleware."""
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.security import get_security_middleware
+
+
+async def _ok(_request):
+    """Einfacher Endpoint für die Tests."""
+    return PlainTextResponse('ok')
+
+
+def _client() -> TestClient:
+    """Erstellt einen TestClient mit der Security-Middleware."""
+    app = Starlette(
+        routes=[
+            Route('/api/v1/health', _ok),
+            Route('/api/v1/data', _ok, methods=['GET', 'POST']),
+        ],
+        middleware=get_security_middleware(),
+    )
+    return TestClient(app)
+
+
+def test_security_headers_added():
+    """Testet, dass Security Headers gesetzt werden."""
+    response = _client().get('/api/v1/data')
+    assert response.status_code == 200
+    assert response.headers['x-frame-options'] == 'DENY'
+    assert response.headers['x-content-type-options'] == 'nosniff'
+    assert 'content-security-policy' in response.headers
+    assert 'cache-control' not in response.headers
+
+
+def test_health_endpoint_not_cached():
+    """Testet Cache-Control-Header für sensitive Endpoints."""
+    response = _client().get('/api/v1/health')
+    assert response.headers['cache-control'] == 'no-cache, no-store, must-revalidate'
+    assert response.headers['pragma'] == 'no-cache'
+
+
+def test_oversized_request_rejected():
+    """Testet, dass zu große Requests abgelehnt werden."""
+    response = _client().post(
+        '/api/v1/data',
+        headers={'content-length': str(10**15)},
+    )
+    assert response.status_code == 400
+    assert response.json() == {'error': 'Security validation failed'}
@@ -0,0 +1,64 @@
+"""Tests für die Datei-Validierung."""
+
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.validation import FileValidator
+
+
+async def _validate(filename: str, content: bytes) -> tuple[bool, str, dict | None]:
+    """Validiert einen Upload aus Bytes und räumt die Temp-Datei auf."""
+    upload = UploadFile(io.BytesIO(content), filename=filename)
+    result = await FileValidator().validate_upload_file(upload)
+    if result[2]:
+        Path(result[2]['temp_path']).unlink(missing_ok=True)
+    return result
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('filename', 'content'),
+    [
+        ('bild.gif', b'GIF87a\x01\x00\x01\x00'),
+        ('bild.gif', b'GIF89a\x01\x00\x01\x00'),
+        ('bild.tiff', b'II*\x00\x08\x00\x00\x00'),
+        ('bild.tiff', b'MM\x00*\x00\x00\x00\x08'),
+        ('daten.json', b'{"a": 1}'),
+        ('daten.json', b'[1, 2]'),
+        ('seite.html', b'<!DOCTYPE html><html></html>'),
+        ('seite.html', b'<!doctype html><html></html>'),
+        ('seite.html', b'<HTML><BODY>x</BODY></HTML>'),
+    ],
+)
+async def test_alternative_signatures_accepted(filename, content):
+    """Testet, dass alle alternativen Datei-Signaturen akzeptiert werden."""
+    is_valid, error_message, file_info = await _validate(filename, content)
+    assert is_valid, error_message
+    assert file_info['size'] == len(content)
+
+
+@pytest.mark.asyncio
+async def test_signature_mismatch_rejected():
+    """Testet, dass eine falsche Datei-Signatur abgelehnt wird."""
+    is_valid, error_message, _ = await _validate('daten.json', b'a: 1\n')
+    assert not is_valid
+    assert 'Signatur' in error_message
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_stops_copy(monkeypatch):
+    """Testet, dass ein zu großer Upload beim Überschreiten abgebrochen wird."""
+    validator = FileValidator()
+    monkeypatch.setattr(validator, 'max_file_size', 1000)
+    source = io.BytesIO(b'{' + b' ' * (5 * 1024 * 1024))
+    upload = UploadFile(source, filename='daten.json')
+
+    is_valid, error_message, _ = await validator.validate_upload_file(upload)
+
+    assert not is_valid
+    assert 'zu groß' in error_message
+    # Nur der erste Block wurde gelesen, nicht die ganze Datei
+    assert source.tell() < 1024 * 1024